@@ -1,31 +1,60 @@
 #!/usr/bin/env python3
 """
 Script to create an animated map of crash density over time.
+
+    python -m scripts.animate_crashes                                   # show it interactively
+    python -m scripts.animate_crashes --save crash_density.gif          # export, one frame per year
+    python -m scripts.animate_crashes --save crash_density.mp4 --period month --fps 4
+    python -m scripts.animate_crashes --save frames/ --workers 4        # directory of PNG frames
+
+Exports render frames in parallel processes (all cores by default); .mp4 and other
+video formats need ffmpeg on PATH.
 """
 
+import argparse
 import sys
 import os
 
 # Add parent directory to path to import src modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.visualization.heatmap import animate_crash_density_over_time
+from src.visualization.heatmap import animate_crash_density_over_time, crash_density_frames
 import matplotlib.pyplot as plt
 
-if __name__ == "__main__":
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", metavar="PATH", help=".gif, video file or directory to export to, instead of showing")
+    parser.add_argument("--period", choices=["year", "month"], default="year", help="time span of one frame")
+    parser.add_argument("--style", default="gray", help="basemap style")
+    parser.add_argument("--gridsize", type=int, default=40)
+    parser.add_argument("--fps", type=float, default=1.0, help="frames per second")
+    parser.add_argument("--dpi", type=float, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: all cores)")
+    args = parser.parse_args(argv)
+    figsize = (12, 10)
+
+    if args.save:
+        from src.visualization.export import export_density_animation
+
+        frames = crash_density_frames(gridsize=args.gridsize, period=args.period)
+        print(f"Rendering {len(frames)} frames to {args.save}...")
+        export_density_animation(frames, args.save, basemap_style=args.style, figsize=figsize,
+                                 dpi=args.dpi, fps=args.fps, workers=args.workers)
+        print("Animation saved!")
+        return
+
     print("Creating animated crash density map...")
-    
-    # Create animation (will display interactively)
     fig, anim = animate_crash_density_over_time(
-        basemap_style="gray",
-        gridsize=40,
-        interval=1000,  # 1 second per frame
-        figsize=(12, 10)
+        basemap_style=args.style,
+        gridsize=args.gridsize,
+        interval=int(1000 / args.fps),
+        figsize=figsize,
+        period=args.period,
     )
-    
-    # Optionally save to file (uncomment to save)
-    # anim.save("crash_density_animation.gif", writer="pillow", fps=1)
-    
     print("Animation created! Close the window to exit.")
     plt.show()  # This will display the animation and keep it running
 
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Measure the startup cost of importing the package, each module in a fresh interpreter,
+and guard it: importing must not load the crash dataset or any of the heavy optional
+libraries (they are imported on first use), and must stay under --max-ms.
+
+    python -m scripts.bench_import                          # default modules, best of 3
+    python -m scripts.bench_import src.app --repeat 5 --max-ms 3000
+
+Exits with status 1 if a guard fails, so it can run in CI.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+DEFAULT_MODULES = ["src.utils", "src.visualization", "src.visualization.heatmap"]
+# imported lazily by the code paths that need them
+DEFERRED_MODULES = ["geopandas", "shapely", "pyproj", "contextily", "rasterio", "kagglehub", "scipy"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+from src.utils import get_registry
+print(json.dumps({{
+    "ms": elapsed * 1000,
+    "dataset_loaded": get_registry().is_loaded(),
+    "deferred": [m for m in {deferred!r} if m in sys.modules],
+}}))
+"""
+
+
+def probe(module: str) -> dict:
+    """Import module in a new interpreter and report time, dataset state and heavy imports."""
+    code = _PROBE.format(module=module, deferred=DEFERRED_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module (best is reported)")
+    parser.add_argument("--max-ms", type=float, default=2000, help="fail if an import takes longer")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        runs = [probe(module) for _ in range(args.repeat)]
+        best = min(run["ms"] for run in runs)
+        problems = []
+        if best > args.max_ms:
+            problems.append(f"slower than {args.max_ms:.0f} ms")
+        if any(run["dataset_loaded"] for run in runs):
+            problems.append("loads the dataset")
+        deferred = sorted({m for run in runs for m in run["deferred"]})
+        if deferred:
+            problems.append("imports " + ", ".join(deferred))
+        failed |= bool(problems)
+        print(f"{module:32s} {best:8.0f} ms  {'FAIL: ' + '; '.join(problems) if problems else 'ok'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold-cache basemap tile loading against a local stand-in tile server that
+adds a fixed latency to every request (no real tile host is touched).
+
+    python -m scripts.bench_tiles                      # 50 ms latency, zoom 9, 1 vs 16 workers
+    python -m scripts.bench_tiles --latency 0.1 --zoom 10 --workers 1 4 16
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path to import src modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.visualization import tiles
+
+# crash map extent in EPSG:3857 (North Carolina), so no dataset load is needed
+NC_EXTENT = (-9400000.0, -8400000.0, 4000000.0, 4400000.0)
+
+
+def _tile_png() -> bytes:
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (256, 256), (200, 200, 200)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def start_tile_server(latency: float) -> ThreadingHTTPServer:
+    """Serve the same PNG for every /z/x/y.png after sleeping latency seconds."""
+    png = _tile_png()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, like real tile hosts
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(png)))
+            self.end_headers()
+            self.wfile.write(png)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every tile request")
+    parser.add_argument("--zoom", type=int, default=9)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, tiles.MAX_FETCH_WORKERS])
+    args = parser.parse_args(argv)
+
+    server = start_tile_server(args.latency)
+    source = f"http://127.0.0.1:{server.server_port}/{{z}}/{{x}}/{{y}}.png"
+    xs, ys = tiles.tile_range(NC_EXTENT, args.zoom)
+    wanted = [(args.zoom, x, y) for x in xs for y in ys]
+    print(f"{len(wanted)} tiles at zoom {args.zoom}, {args.latency * 1000:.0f} ms latency")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            # a fresh store per run, so every run starts cold
+            store = tiles.TileStore(os.path.join(tmp, f"bench_{workers}.mbtiles"))
+            start = time.perf_counter()
+            fetched = tiles.fetch_tiles(source, wanted, store=store, workers=workers)
+            elapsed = time.perf_counter() - start
+            store.close()
+            print(f"  workers={workers:3d}: {elapsed:6.2f} s ({len(fetched) / elapsed:7.1f} tiles/s)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
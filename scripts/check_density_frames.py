@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Check the frame timeline of crash_density_frames on a small synthetic dataset (no
+download needed): monthly frames must be contiguous calendar months, with a year
+without crashes showing up as 12 empty frames.
+
+    python -m scripts.check_density_frames
+
+Exits with status 1 if a check fails, so it can run in CI.
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import src modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pandas as pd
+
+from src.utils import MONTH_ORDER
+from src.visualization.heatmap import crash_density_frames
+
+
+def main():
+    # crashes in 2007 and 2009 only, around Raleigh
+    df = pd.DataFrame({
+        "CrashYear": [2007, 2007, 2009, 2009],
+        "CrashMonth": ["March", "December", "January", "May"],
+        "Latitude": [35.77, 35.78, 35.79, 35.80],
+        "Longitude": [-78.64, -78.63, -78.62, -78.61],
+    })
+    frames = crash_density_frames(df, gridsize=10, period="month")
+    failed = []
+
+    expected = [f"{month} {year}" for year in (2007, 2008, 2009) for month in MONTH_ORDER][2:29]
+    if frames.labels != expected:
+        failed.append(f"monthly labels {frames.labels[0]} .. {frames.labels[-1]} are not contiguous: {frames.labels}")
+    gap = [i for i, label in enumerate(frames.labels) if label.endswith(" 2008")]
+    if len(gap) != 12 or frames.crashes[gap].any():
+        failed.append(f"2008 should be 12 empty frames, got {len(gap)} with {int(frames.crashes[gap].sum())} crashes")
+    if frames.crashes.sum() != len(df):
+        failed.append(f"frames hold {frames.crashes.sum()} crashes, expected {len(df)}")
+
+    yearly = crash_density_frames(df, gridsize=10, period="year")
+    if yearly.labels != ["Year 2007", "Year 2009"]:
+        failed.append(f"yearly labels: {yearly.labels}")
+
+    for problem in failed:
+        print(f"FAIL: {problem}")
+    print("ok" if not failed else f"{len(failed)} check(s) failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
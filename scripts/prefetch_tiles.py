@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Warm the persistent basemap tile store with every tile covering the crash map extent,
+so the app and the renderers work offline afterwards (set BIKE_CRASH_TILES_OFFLINE=1).
+
+    python -m scripts.prefetch_tiles                       # street + gray styles, auto zoom
+    python -m scripts.prefetch_tiles --zoom 8 9 10 --style street
+    python -m scripts.prefetch_tiles --url "http://127.0.0.1:8000/{z}/{x}/{y}.png"
+"""
+
+import argparse
+import sys
+import os
+
+# Add parent directory to path to import src modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils import get_full_bounds
+from src.visualization.basemap import get_basemap_source
+from src.visualization.tiles import DEFAULT_STORE_BYTES, auto_zoom, get_tile_store, prefetch_tiles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--style", nargs="+", default=["street", "gray"],
+                        help="basemap styles to warm (default: street gray)")
+    parser.add_argument("--zoom", nargs="+", type=int,
+                        help="zoom levels (default: the level the maps pick for the full extent)")
+    parser.add_argument("--url", help="tile URL template to use instead of the styles, e.g. a local tile server")
+    parser.add_argument("--bounds", nargs=4, type=float, metavar=("XMIN", "YMIN", "XMAX", "YMAX"),
+                        help="EPSG:3857 bounds (default: FULL_BOUNDS of the crash data)")
+    parser.add_argument("--max-mb", type=int, default=DEFAULT_STORE_BYTES // (1024 * 1024),
+                        help="size limit of each tile store in MB")
+    args = parser.parse_args(argv)
+
+    xmin, ymin, xmax, ymax = args.bounds or get_full_bounds()
+    extent = (xmin, xmax, ymin, ymax)
+    zooms = args.zoom or [auto_zoom(extent)]
+    sources = [args.url] if args.url else [get_basemap_source(style) for style in args.style]
+
+    for source in sources:
+        store = get_tile_store(source, max_bytes=args.max_mb * 1024 * 1024)
+        count = prefetch_tiles(source, extent, zooms)
+        print(f"{getattr(source, 'name', source)}: {count} tiles at zoom {zooms} "
+              f"({store.total_bytes() / 1e6:.1f} MB in {store.path})")
+
+
+if __name__ == "__main__":
+    main()
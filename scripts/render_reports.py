@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Render dashboard report images, the crash heatmap next to the severity histogram as
+App.update_plot draws them, for a manifest of filter states. Runs headless on Agg
+canvases (no display server) in a pool of worker processes.
+
+    python -m scripts.render_reports reports.json --out reports/
+    python -m scripts.render_reports reports.json --out reports/ --format png svg --workers 8
+
+The manifest is a JSON list of filter states (or {"reports": [...]}):
+
+    [
+      {"name": "night_unlit", "filters": {"LightCond": "Dark - Roadway Not Lighted"}},
+      {"name": "summer_hitrun_evening", "filters": {"HitRun": "Yes"},
+       "hours": [17, 23], "months": ["June", "August"]}
+    ]
+
+filters takes the dashboard's dropdown columns (see FILTER_COLUMNS), omitted ones are
+"Any"; hours default to 0-23 and months (names or 1-12) to January-December. dark_mode
+defaults to what the dashboard picks for the light condition. Each report is written to
+<out>/<name>.<format>.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add parent directory to path to import src modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.utils import MONTH_ORDER, get_registry
+from src.visualization.dashboard import FILTER_COLUMNS, SeverityHistogram, dashboard_artifacts, is_dark_mode
+from src.visualization.heatmap import CrashHeatmap
+
+
+def _month_name(value) -> str:
+    if isinstance(value, int):
+        return MONTH_ORDER[value - 1]
+    if value not in MONTH_ORDER:
+        raise ValueError(f"unknown month {value!r}")
+    return value
+
+
+def load_manifest(path: str) -> list[dict]:
+    """Read the manifest and fill in the defaults of every report."""
+    with open(path) as f:
+        manifest = json.load(f)
+    if isinstance(manifest, dict):
+        manifest = manifest["reports"]
+
+    reports = []
+    for i, entry in enumerate(manifest):
+        filters = entry.get("filters", {})
+        unknown = set(filters) - set(FILTER_COLUMNS)
+        if unknown:
+            raise ValueError(f"report {i}: unknown filter columns {sorted(unknown)}, use {FILTER_COLUMNS}")
+        choices = {column: filters.get(column, "Any") for column in FILTER_COLUMNS}
+        hours = tuple(entry.get("hours", (0, 23)))
+        months = tuple(_month_name(m) for m in entry.get("months", (MONTH_ORDER[0], MONTH_ORDER[-1])))
+        name = re.sub(r"[^\w.-]+", "_", str(entry.get("name", f"report_{i:03d}")))
+        reports.append({
+            "name": name,
+            "choices": choices,
+            "ranges": {"CrashHour": hours, "CrashMonth": months},
+            "dark_mode": entry.get("dark_mode", is_dark_mode(choices["LightCond"])),
+        })
+    names = [report["name"] for report in reports]
+    if len(set(names)) != len(names):
+        raise ValueError("report names must be unique")
+    return reports
+
+
+class ReportRenderer:
+    """One headless dashboard figure (histogram | heatmap), reused for every report."""
+
+    def __init__(self, basemap_style: str = "street", gridsize: int = 40, figsize=(18, 8), dpi: float = 100):
+        registry = get_registry()
+        self.coords = registry.coords()
+        self.injuries, self.filter_index, self.count_cube = dashboard_artifacts(registry)
+
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        # same proportions as the dashboard window
+        hist_figure, heatmap_figure = self.figure.subfigures(1, 2, width_ratios=[1, 2])
+        self.histogram = SeverityHistogram(hist_figure)
+        self.heatmap = CrashHeatmap(heatmap_figure, basemap_style=basemap_style, gridsize=gridsize)
+
+    def render(self, report: dict, out_dir: str, formats: list[str]) -> list[str]:
+        choices, ranges = report["choices"], report["ranges"]
+        injury_counts = self.count_cube.counts(choices, ranges)
+        selection = self.filter_index.select(equals=choices, ranges=ranges)
+
+        self.heatmap.set_dark_mode(report["dark_mode"])
+        self.heatmap.set_data(coords=self.coords, selection=selection, injuries=self.injuries)
+        self.histogram.update(injury_counts, ranges["CrashHour"], ranges["CrashMonth"], report["dark_mode"])
+
+        paths = []
+        # the heatmap's layers are animated artists, which savefig skips otherwise
+        with self.heatmap.layers.flattened():
+            for fmt in formats:
+                path = os.path.join(out_dir, f"{report['name']}.{fmt}")
+                self.figure.savefig(path, format=fmt)
+                paths.append(path)
+        return paths
+
+
+# per worker process; forked workers inherit the parent's, with the dataset, indexes
+# and basemap raster already loaded
+_renderer = None
+
+
+def _init_worker(renderer_args: tuple):
+    global _renderer
+    if _renderer is None:
+        _renderer = ReportRenderer(*renderer_args)
+
+
+def _render(task: tuple) -> tuple[str, list[str], float]:
+    report, out_dir, formats = task
+    start = time.perf_counter()
+    paths = _renderer.render(report, out_dir, formats)
+    return report["name"], paths, time.perf_counter() - start
+
+
+def main(argv=None):
+    global _renderer
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("manifest", help="JSON manifest of filter states")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--format", nargs="+", default=["png"], dest="formats", help="png, svg, pdf, ...")
+    parser.add_argument("--style", default="street", help="basemap style")
+    parser.add_argument("--gridsize", type=int, default=40)
+    parser.add_argument("--dpi", type=float, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    reports = load_manifest(args.manifest)
+    os.makedirs(args.out, exist_ok=True)
+    workers = max(min(args.workers or os.cpu_count() or 1, len(reports)), 1)
+
+    start = time.perf_counter()
+    renderer_args = (args.style, args.gridsize, (18, 8), args.dpi)
+    # load the dataset, build the indexes and fetch the basemap once, before forking
+    _renderer = ReportRenderer(*renderer_args)
+    print(f"Loaded data and basemap in {time.perf_counter() - start:.1f} s; "
+          f"rendering {len(reports)} reports with {workers} worker(s)")
+
+    tasks = [(report, args.out, args.formats) for report in reports]
+    if workers == 1:
+        results = map(_render, tasks)
+        pool = None
+    else:
+        # fork shares the loaded state copy-on-write; elsewhere each worker loads it
+        # (from the local snapshot and tile caches)
+        context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                   initializer=_init_worker, initargs=(renderer_args,))
+        results = pool.map(_render, tasks)
+
+    try:
+        for name, paths, seconds in results:
+            print(f"  {name}: {', '.join(paths)} ({seconds:.2f} s)")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    print(f"Done in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 # PyQT6 Class for Bar Chart Visualization App
 import matplotlib.pyplot as plt
 from PyQt6.QtWidgets import QMainWindow, QApplication, QWidget, QVBoxLayout, QComboBox, QLabel, QHBoxLayout, QSlider
-from src.utils import load_bike_crash_data, filter_data, prepare_crash_geodata
+from src.utils import get_crash_data, filter_data, prepare_crash_geodata
 from src.visualization.heatmap import plot_crash_hexbin
 from PyQt6.QtCore import Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
@@ -20,7 +20,7 @@ class SmallMultiplesApp(QMainWindow):
         self.setWindowTitle("Small Multiples Dashboard")
         self.setGeometry(100, 100, 1200, 800)
 
-        self.df = load_bike_crash_data()
+        self.df = get_crash_data()
         self.cetegories = ['LightCond', 'SpeedLimit', 'BikeSex', 'RuralUrban', "BikeAlcFlg"]
         self.injury_order = ["O: No Injury", "C: Possible Injury", "B: Suspected Minor Injury",
                              "A: Suspected Serious Injury", "K: Killed", "Unknown Injury"]
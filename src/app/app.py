@@ -1,38 +1,44 @@
 # PyQT6 Class for Bar Chart Visualization App
-import matplotlib.pyplot as plt
 from PyQt6.QtWidgets import QMainWindow, QApplication, QWidget, QVBoxLayout, QComboBox, QLabel, QHBoxLayout, QSlider
-from src.utils import load_bike_crash_data, filter_data, prepare_crash_geodata
-from src.visualization.heatmap import plot_crash_hexbin
+from src.utils import get_registry, FilteredView, MONTH_ORDER, INJURY_ORDER
+from src.visualization.dashboard import (INFO_COLUMNS, PRETTY_INJURY_LABELS, SeverityHistogram, dashboard_artifacts,
+                                         is_dark_mode, range_texts)
+from src.visualization.heatmap import CrashHeatmap
+from src.app.scheduler import UpdateScheduler
+from src.app.worker import BackgroundUpdater
 from PyQt6.QtCore import Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 import sys
 import pandas as pd
-import matplotlib.ticker as mtick
 from superqt import QRangeSlider
-import matplotlib.colors as mcolors
-import matplotlib.cm as cm
-import numpy as np
+
+# widget changes recompute the plots at most this often (slider drags fire per step)
+UPDATE_INTERVAL_MS = 50
 
 class App(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.df = load_bike_crash_data()
+        # shared with every other window in this process; projected once, every update only indexes these arrays
+        registry = get_registry()
+        self.df = registry.data()
+        self.coords = registry.coords()
+        self.injuries, self.filter_index, self.count_cube = dashboard_artifacts(registry)
+        # dropdown state -> hour x month prefix-sum table, see _injury_counts (only the
+        # update worker thread touches it)
+        self._range_tables = {}
+        # (filters, ranges) -> info box HTML, same thread rule
+        self._info_texts = {}
+        # every filter widget goes through this, so a burst of changes is one update_plot
+        self.update_scheduler = UpdateScheduler(self.update_plot, UPDATE_INTERVAL_MS, parent=self)
+        # filtering and binning run off the GUI thread, see update_plot
+        self.updater = BackgroundUpdater(self._compute_update, self._apply_update, parent=self)
         self.resize(1400, 850)
 
         # Label
-        self.injury_order = ["O: No Injury", "C: Possible Injury", "B: Suspected Minor Injury",
-                             "A: Suspected Serious Injury", "K: Killed", "Unknown Injury"]
-        self.pretty_injury_labels = {
-            "O: No Injury": "No Injury",
-            "C: Possible Injury": "Possible Injury",
-            "B: Suspected Minor Injury": "Suspected Minor Injury",
-            "A: Suspected Serious Injury": "Suspected Serious Injury",
-            "K: Killed": "Killed",
-            "Unknown Injury": "Unknown Injury"
-        }
-        self.months = ["Any", "January", "February", "March", "April", "May", "June", "July",
-                       "August", "September", "October", "November", "December"]
+        self.injury_order = list(INJURY_ORDER)
+        self.pretty_injury_labels = PRETTY_INJURY_LABELS
+        self.months = ["Any"] + MONTH_ORDER
 
         self.setWindowTitle("Bike Accidents by Severity")
 
@@ -46,14 +52,14 @@ class App(QMainWindow):
         filter_row.addWidget(QLabel("Alcohol involvement:"))
         self.alcohol_filter = QComboBox()
         self.alcohol_filter.addItems(["Any", "Yes", "No"])
-        self.alcohol_filter.currentIndexChanged.connect(self.update_plot)
+        self.alcohol_filter.currentIndexChanged.connect(self.update_scheduler.request)
         filter_row.addWidget(self.alcohol_filter)
 
         # HitRun filter
         filter_row.addWidget(QLabel("Hit and Run:"))
         self.hitrun_filter = QComboBox()
         self.hitrun_filter.addItems(["Any", "Yes", "No"])
-        self.hitrun_filter.currentIndexChanged.connect(self.update_plot)
+        self.hitrun_filter.currentIndexChanged.connect(self.update_scheduler.request)
         filter_row.addWidget(self.hitrun_filter)
 
         # LightCond
@@ -62,7 +68,7 @@ class App(QMainWindow):
         self.lightcond_filter.addItems(
             ["Any", "Daylight", "Dark - Lighted Roadway", "Dark - Roadway Not Lighted", "Dusk",
              "Dawn"])
-        self.lightcond_filter.currentIndexChanged.connect(self.update_plot)
+        self.lightcond_filter.currentIndexChanged.connect(self.update_scheduler.request)
         filter_row.addWidget(self.lightcond_filter)
 
         # BikePos
@@ -71,7 +77,7 @@ class App(QMainWindow):
         self.bikepos_filter.addItems(
             ["Any", "Travel Lane", "Sidewalk / Crosswalk / Driveway Crossing", "Bike Lane / Paved Shoulder",
              "Non-Roadway", "Unknown"])
-        self.bikepos_filter.currentIndexChanged.connect(self.update_plot)
+        self.bikepos_filter.currentIndexChanged.connect(self.update_scheduler.request)
         filter_row2.addWidget(self.bikepos_filter)
 
         # TraffCntrl
@@ -80,7 +86,7 @@ class App(QMainWindow):
         self.traffcntrl_filter.addItems(
             ["Any", "No Control Present", "Stop Sign", "Stop And Go Signal",
              "Double Yellow Line, No Passing Zone", "Missing"])
-        self.traffcntrl_filter.currentIndexChanged.connect(self.update_plot)
+        self.traffcntrl_filter.currentIndexChanged.connect(self.update_scheduler.request)
         filter_row2.addWidget(self.traffcntrl_filter)
 
         # SpeedLimit
@@ -89,7 +95,7 @@ class App(QMainWindow):
         self.speedlimit_filter.addItems(
             ["Any", "5 - 15 MPH", "20 - 25  MPH", "30 - 35  MPH",
              "40 - 45  MPH", "50 - 55  MPH"])
-        self.speedlimit_filter.currentIndexChanged.connect(self.update_plot)
+        self.speedlimit_filter.currentIndexChanged.connect(self.update_scheduler.request)
         filter_row2.addWidget(self.speedlimit_filter)
 
         # --- Time Slider ---
@@ -107,7 +113,7 @@ class App(QMainWindow):
         self.time_slider.setValue((0, 23))
         self.time_slider.setTickInterval(1)
         self.time_slider.setTickPosition(QSlider.TickPosition.TicksBelow)
-        self.time_slider.valueChanged.connect(self.update_plot)
+        self.time_slider.valueChanged.connect(self.update_scheduler.request)
         time_layout.addWidget(self.time_slider)
 
         ### Right selection text
@@ -142,7 +148,7 @@ class App(QMainWindow):
         self.month_slider.setTickInterval(1)
 
         self.month_slider.setTickPosition(QSlider.TickPosition.TicksBelow)
-        self.month_slider.valueChanged.connect(self.update_plot)
+        self.month_slider.valueChanged.connect(self.update_scheduler.request)
         month_layout.addWidget(self.month_slider)
 
         ### right selection text
@@ -166,10 +172,14 @@ class App(QMainWindow):
         # --- Matplotlib figure Histogram ---
         self.figure_hist = Figure(figsize=(12, 8))
         self.canvas_hist = FigureCanvasQTAgg(self.figure_hist)
+        # persistent bars; updates only change their heights
+        self.histogram = SeverityHistogram(self.figure_hist)
 
         # --- Matplotlib figure Heatmap ---
         self.figure_heatmap = Figure(figsize=(12, 8))
         self.canvas_heatmap = FigureCanvasQTAgg(self.figure_heatmap)
+        # built once; updates only redraw the layers that changed (see CrashHeatmap)
+        self.heatmap = CrashHeatmap(self.figure_heatmap, basemap_style="street", gridsize=40)
 
         # Horizontal container for both plots and a key-takeaways section
         plots_row = QHBoxLayout()
@@ -199,150 +209,96 @@ class App(QMainWindow):
         self.update_plot()
 
     def update_plot(self):
-        df_filtered = self.df.copy()
-
-        # Apply alcohol filter
-        alcohol_choice = self.alcohol_filter.currentText()
-        df_filtered = filter_data(df_filtered, "CrashAlcoh", alcohol_choice)
-
-        # Apply hit and run filter
-        hitrun_choice = self.hitrun_filter.currentText()
-        df_filtered = filter_data(df_filtered, "HitRun", hitrun_choice)
-
-        # Apply LightCond filter
-        self.prev_lightcond_choice = getattr(self, 'prev_lightcond_choice', None)
+        """
+        Read the filter widgets and recompute in the background: _compute_update runs on
+        the worker thread, _apply_update then updates the artists on the GUI thread. A
+        newer call cancels a computation still in flight.
+        """
+        # Categorical filters, by column
         lightcond_choice = self.lightcond_filter.currentText()
-        dark_mode_updated = False
-        if lightcond_choice != self.prev_lightcond_choice:
-            df_filtered = filter_data(df_filtered, "LightCond", lightcond_choice)
-            self.prev_lightcond_choice = lightcond_choice
-            dark_mode_updated = True
-        
-        # Check if light condition contains "dark" (case-insensitive) every 
-        is_dark_mode = "dark" in lightcond_choice.lower() if lightcond_choice != "Any" else False
-
-        # Apply BikePos filter
-        bikepos_choice = self.bikepos_filter.currentText()
-        df_filtered = filter_data(df_filtered, "BikePos", bikepos_choice)
-
-        # Apply TraffCntrl filter
-        traffcntrl_choice = self.traffcntrl_filter.currentText()
-        df_filtered = filter_data(df_filtered, "TraffCntrl", traffcntrl_choice)
-
-        # Apply SpeedLimit filter
-        speedlimit_choice = self.speedlimit_filter.currentText()
-        df_filtered = filter_data(df_filtered, "SpeedLimit", speedlimit_choice)
+        choices = {
+            "CrashAlcoh": self.alcohol_filter.currentText(),
+            "HitRun": self.hitrun_filter.currentText(),
+            "LightCond": lightcond_choice,
+            "BikePos": self.bikepos_filter.currentText(),
+            "TraffCntrl": self.traffcntrl_filter.currentText(),
+            "SpeedLimit": self.speedlimit_filter.currentText(),
+        }
 
-        # Apply hour filter
+        # Hour and month ranges
         hour_choice = self.time_slider.value()
-        time_choice_text = str(hour_choice[0]) + ' - ' + str(hour_choice[1])
-        if hour_choice[0] == -1:
-            self.time_label.setText("Any")
-        else:
-            self.time_label.setText(time_choice_text)
-            df_filtered = df_filtered[df_filtered["CrashHour"] >= hour_choice[0]]
-            df_filtered = df_filtered[df_filtered["CrashHour"] <= hour_choice[1]]
-
-        # Apply month filter
         month_choice = self.month_slider.value()
-        month_choice_text = self.months[month_choice[0]][:3] + "-" + self.months[month_choice[1]][:3]
+        ranges = {
+            "CrashHour": (hour_choice[0], hour_choice[1]),
+            "CrashMonth": (self.months[month_choice[0]], self.months[month_choice[1]]),
+        }
+        time_choice_text, month_choice_text = range_texts(ranges["CrashHour"], ranges["CrashMonth"])
+        self.time_label.setText(time_choice_text)
         self.month_label.setText(month_choice_text)
-        month_choice_list = self.months[month_choice[0]:month_choice[1]+1]
-        df_filtered = df_filtered[df_filtered["CrashMonth"].isin(month_choice_list)]
+
+        # Check if light condition contains "dark" (case-insensitive) every 
+        dark_mode = is_dark_mode(lightcond_choice)
+        self.updater.submit({"choices": choices, "ranges": ranges, "dark_mode": dark_mode})
+
+    def _compute_update(self, state: dict, checkpoint) -> dict:
+        """Data side of an update (worker thread): no widgets or artists in here."""
+        choices, ranges = state["choices"], state["ranges"]
+
+        # Severity counts (and the total) come straight from the count cube
+        injury_counts = self._injury_counts(choices, ranges)
+        # Row positions matching every filter, from the precomputed bitsets
+        selection = self.filter_index.select(equals=choices, ranges=ranges)
+        checkpoint()
+
+        # hex counts of every zoom level, also behind the tooltips
+        level_counts, labels = self.heatmap.count_levels(coords=self.coords, selection=selection,
+                                                         injuries=self.injuries)
+        checkpoint()
+
+        # the info box only materializes the columns it reads, and only for new filters
+        info_key = (tuple(choices.values()), ranges["CrashHour"], ranges["CrashMonth"])
+        info_text = self._info_texts.get(info_key)
+        if info_text is None:
+            info_view = FilteredView(self.df, selection, INFO_COLUMNS)
+            info_text = self._info_text(info_view, int(injury_counts.sum()))
+            if len(self._info_texts) >= 256:
+                self._info_texts.clear()
+            self._info_texts[info_key] = info_text
+        return {"injury_counts": injury_counts, "level_counts": level_counts, "labels": labels,
+                "info_text": info_text}
+
+    def _apply_update(self, state: dict, result: dict):
+        """Artist side of an update (GUI thread), with what _compute_update produced."""
+        ranges, dark_mode = state["ranges"], state["dark_mode"]
 
         # -0---------------- Plot heatmap ---------------------
-        
-        # Clear previous plot
-        self.figure_heatmap.clear()
-        ax = self.figure_heatmap.add_subplot(1, 1, 1)
-        
-        gdf_web = prepare_crash_geodata(df_filtered)
-        plot_crash_hexbin(gdf_web, basemap_style="street", gridsize=40, ax=ax, dark_mode=is_dark_mode, dark_mode_updated=dark_mode_updated)
-        self.canvas_heatmap.draw()
-        
-        # ----------------- Plot histogram ---------------------
 
-        # Clear previous plot
-        self.figure_hist.clear()
-        ax = self.figure_hist.add_subplot(1, 1, 1)
-
-        # Apply dark mode styling to histogram
-        # Always explicitly reset colors to ensure proper switching between modes
-        if is_dark_mode:
-            self.figure_hist.patch.set_facecolor('#1a1a1a')
-            ax.set_facecolor('#1a1a1a')
-            text_color = 'white'
-            label_color = 'white'
-            tick_color = 'white'
-            grid_color = "#797979"
-        else:
-            # Explicitly reset to light mode defaults
-            self.figure_hist.patch.set_facecolor('white')
-            ax.set_facecolor('white')
-            text_color = 'black'
-            label_color = 'black'
-            tick_color = 'black'
-            grid_color = '#cccccc'
-
-        num_filtered = len(df_filtered)
-        counts = df_filtered["BikeInjury"].value_counts()
-        num_filtered = len(df_filtered)
-        counts = df_filtered["BikeInjury"].value_counts()
-
-        if num_filtered == 0:
-            ordered_counts = [0 for _ in self.injury_order]
-        else:
-            ordered_counts = [100 * counts.get(cat, 0) / num_filtered for cat in self.injury_order]
-
-        #Red Color Map
-        cmap = self.adjusted_colormap(cm.YlOrRd, 0.3)
-        norm = mcolors.Normalize(vmin=0, vmax=len(self.injury_order) - 1)
-        colors = [cmap(norm(i)) for i in range(len(self.injury_order))]
-
-        ax.bar(self.injury_order, ordered_counts, color=colors)
-
-        ax.set_xticks(range(len(self.injury_order)))
-        ax.set_xticklabels([self.pretty_injury_labels[label] for label in self.injury_order], rotation=25, ha="right", fontsize=8, color=text_color)
-
-        histogram_title = f"Bike Injury By Severity During {month_choice_text}"
-        if time_choice_text != "0 - 23":
-            histogram_title = f"Bike Injury By Severity During {month_choice_text} \n At Time {time_choice_text}"
-        ax.set_title(histogram_title, color=text_color)
-        ax.set_xlabel("Injury Severity", color=label_color)
-        ax.set_ylabel("Percentage of Accidents", color=label_color)
-        ax.yaxis.set_major_formatter(mtick.FormatStrFormatter('%.0f%%'))
-        
-        # Set tick colors
-        ax.tick_params(colors=tick_color)
-        ax.spines['bottom'].set_color(tick_color)
-        ax.spines['top'].set_color(tick_color)
-        ax.spines['right'].set_color(tick_color)
-        ax.spines['left'].set_color(tick_color)
-        
-        # Set grid color
-        ax.grid(True, alpha=0.3, color=grid_color)
+        # restyling (background redraw) only happens when dark mode actually toggles
+        self.heatmap.set_dark_mode(dark_mode)
+        self.heatmap.set_counts(result["level_counts"], result["labels"])
+        self.heatmap.draw()
 
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        # Use appropriate grid color based on dark mode
-        ax.yaxis.grid(True, linestyle='--', linewidth=0.7, color=grid_color, alpha=0.7)
+        # ----------------- Plot histogram ---------------------
 
-        # shift hist up a to avoid cutting off category labels
-        self.figure_hist.subplots_adjust(left=0.2, bottom=0.2)
-        
+        # new bar heights and title; the theme only changes when dark mode toggles
+        self.histogram.update(result["injury_counts"], ranges["CrashHour"], ranges["CrashMonth"], dark_mode)
         self.canvas_hist.draw()
-        
+
+        if result["info_text"] != self.info_box.text():
+            self.info_box.setText(result["info_text"])
+
+    def _info_text(self, info_view: FilteredView, num_filtered: int) -> str:
         # Update Info Box
-        most_common_biker_age_group = self._get_most_common_category(df_filtered, 'BikeAgeGrp')
-        most_common_driver_age_group = self._get_most_common_category(df_filtered, 'DrvrAgeGrp')
-        most_common_biker_direction = self._get_most_common_category(df_filtered, 'BikeDir')
-        most_common_crash_loc = self._get_most_common_category(df_filtered, 'CrashLoc')
-        most_common_scenario = self._get_most_common_category(df_filtered, 'CrashGrp')
-        most_common_vehicle_type = self._get_most_common_category(df_filtered, 'DrvrVehTyp')
-        driver_alcohol_rate = df_filtered['DrvrAlcFlg'].value_counts(normalize=True).get('Yes', 0) * 100 if not df_filtered.empty else 0
-        hit_and_run_rate = df_filtered['HitRun'].value_counts(normalize=True).get('Yes', 0) * 100 if not df_filtered.empty else 0
+        most_common_biker_age_group = self._get_most_common_category(info_view, 'BikeAgeGrp')
+        most_common_driver_age_group = self._get_most_common_category(info_view, 'DrvrAgeGrp')
+        most_common_biker_direction = self._get_most_common_category(info_view, 'BikeDir')
+        most_common_crash_loc = self._get_most_common_category(info_view, 'CrashLoc')
+        most_common_scenario = self._get_most_common_category(info_view, 'CrashGrp')
+        most_common_vehicle_type = self._get_most_common_category(info_view, 'DrvrVehTyp')
+        driver_alcohol_rate = info_view['DrvrAlcFlg'].value_counts(normalize=True).get('Yes', 0) * 100 if not info_view.empty else 0
+        hit_and_run_rate = info_view['HitRun'].value_counts(normalize=True).get('Yes', 0) * 100 if not info_view.empty else 0
         info_text = f"""
-<b>Additional Filtered Info: ({len(df_filtered):,} accidents)</b><br>
+<b>Additional Filtered Info: ({num_filtered:,} accidents)</b><br>
 <table style="border-spacing: 50px 5px; text-align: left;">
 <tr>
 <td> <u>Most Common Biker Age Group</u>: {most_common_biker_age_group}</td>
@@ -363,9 +319,34 @@ class App(QMainWindow):
 </tr>
 </table>
         """
-        self.info_box.setText(info_text)
-    
-    def _get_avg(self, df: pd.DataFrame, column: str) -> str:
+        return info_text
+
+    def invalidate_heatmap(self, layer: str | None = None):
+        """Redraw one heatmap layer ("hex", "colorbar", "tooltip"), or everything with None."""
+        self.heatmap.invalidate(layer)
+        self.heatmap.draw()
+
+    def closeEvent(self, event):
+        # don't leave a computation running behind a closed window
+        self.updater.cancel()
+        self.updater.wait()
+        super().closeEvent(event)
+
+    def _injury_counts(self, choices: dict, ranges: dict) -> pd.Series:
+        """
+        Crash counts per injury level for the current filters. The hour x month prefix-sum
+        table is built once per dropdown state, so slider drags are constant-time lookups.
+        """
+        key = tuple(choices.values())
+        table = self._range_tables.get(key)
+        if table is None:
+            if len(self._range_tables) >= 64:
+                self._range_tables.clear()
+            table = self.count_cube.range_table(choices, "CrashHour", "CrashMonth")
+            self._range_tables[key] = table
+        return self.count_cube.range_counts(table, ranges["CrashHour"], ranges["CrashMonth"])
+
+    def _get_avg(self, df: pd.DataFrame | FilteredView, column: str) -> str:
         if df.empty:
             return "N/A"
         avg_value = df[column].str.replace(r'\D', '', regex=True).astype(int).mean()
@@ -373,7 +354,7 @@ class App(QMainWindow):
             return "N/A"
         return f"{avg_value:.1f}"
     
-    def _get_most_common_category(self, df: pd.DataFrame, column: str) -> str:
+    def _get_most_common_category(self, df: pd.DataFrame | FilteredView, column: str) -> str:
         if df.empty:
             return "N/A"
         mode_series = df[column].mode()
@@ -384,13 +365,6 @@ class App(QMainWindow):
         percentage = (df[column] == cat).sum() * 100 / len(df)
         return f"{cat} ({percentage:.1f}%)"
 
-    def adjusted_colormap(self, cmap, minval=0, maxval=1.0, n=100):
-        new_cmap = mcolors.LinearSegmentedColormap.from_list(
-            f'trunc({cmap.name},{minval:.2f},{maxval:.2f})',
-            cmap(np.linspace(minval, maxval, n))
-        )
-        return new_cmap
-
 #TESTING
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -1,7 +1,7 @@
 # PyQT6 Class for Bar Chart Visualization App
 import matplotlib.pyplot as plt
 from PyQt6.QtWidgets import QMainWindow, QApplication, QWidget, QVBoxLayout, QComboBox, QLabel, QHBoxLayout, QSlider
-from src.utils import load_bike_crash_data, filter_data, prepare_crash_geodata
+from src.utils import get_crash_data, filter_data, prepare_crash_geodata
 from src.visualization.heatmap import plot_crash_hexbin
 from PyQt6.QtCore import Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
@@ -126,7 +126,7 @@ class App(QMainWindow):
 if __name__ == "__main__":
     app = QApplication(sys.argv)
 
-    df = load_bike_crash_data()
+    df = get_crash_data()
 
     window = App(df)
     window.show()
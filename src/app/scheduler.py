@@ -0,0 +1,59 @@
+# coalescing of bursts of widget changes into few recomputes
+import time
+
+from PyQt6.QtCore import QObject, QTimer
+
+
+class UpdateScheduler(QObject):
+    """
+    Runs callback at most once per interval_ms, however often request() is called.
+
+    Widget signals call request() instead of the expensive update directly. The first
+    request after a quiet period runs on the next event loop turn (so changes made in
+    the same turn, e.g. by code setting several widgets, share one run); requests
+    arriving while one is pending are merged into it. The callback reads the widgets'
+    current state, so a merged run renders the newest values and superseded ones are
+    never computed; the last request of a burst is always followed by a run.
+
+    The interval counts from the end of the previous run, so even a callback slower
+    than interval_ms leaves the event loop time to process input between runs and a
+    slider drag never queues up stale work.
+    """
+
+    def __init__(self, callback, interval_ms: int = 50, parent=None):
+        super().__init__(parent)
+        self.callback = callback
+        self.interval_ms = interval_ms
+        self._last_run = None       # time.monotonic() at the end of the last run
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._run)
+
+    @property
+    def pending(self) -> bool:
+        return self._timer.isActive()
+
+    def request(self, *args):
+        """Ask for a run; signal arguments are ignored (the callback reads the widgets)."""
+        if self._timer.isActive():
+            return
+        delay = 0
+        if self._last_run is not None:
+            elapsed_ms = (time.monotonic() - self._last_run) * 1000
+            delay = max(int(self.interval_ms - elapsed_ms), 0)
+        self._timer.start(delay)
+
+    def flush(self):
+        """Run a pending request now."""
+        if self._timer.isActive():
+            self._timer.stop()
+            self._run()
+
+    def cancel(self):
+        self._timer.stop()
+
+    def _run(self):
+        try:
+            self.callback()
+        finally:
+            self._last_run = time.monotonic()
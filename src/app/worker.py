@@ -0,0 +1,104 @@
+# background computation for the dashboard: data work on a QThreadPool, artists on the GUI thread
+import sys
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class Cancelled(Exception):
+    """Raised by checkpoint() inside a computation that a newer request superseded."""
+
+
+class _Signals(QObject):
+    # emitted from the pool thread; the receiver lives on the GUI thread, so Qt queues
+    # the call into the GUI event loop
+    finished = pyqtSignal(int, object, object)
+    failed = pyqtSignal(int, str)
+
+
+class _Task(QRunnable):
+    def __init__(self, updater, generation: int, state):
+        super().__init__()
+        self.updater = updater
+        self.generation = generation
+        self.state = state
+
+    def run(self):
+        updater = self.updater
+
+        def checkpoint():
+            if updater.generation != self.generation:
+                raise Cancelled()
+
+        try:
+            checkpoint()
+            result = updater.compute(self.state, checkpoint)
+        except Cancelled:
+            return
+        except Exception:
+            updater._signals.failed.emit(self.generation, traceback.format_exc())
+            return
+        updater._signals.finished.emit(self.generation, self.state, result)
+
+
+class BackgroundUpdater(QObject):
+    """
+    Runs compute(state, checkpoint) on a worker thread and apply(state, result) on the
+    GUI thread, for the newest request only.
+
+    Every submit() starts a new generation. Computations of older generations stop at
+    their next checkpoint() call (it raises Cancelled), queued ones never start, and a
+    result that arrives after a newer submit() is dropped, so apply only ever sees the
+    latest state. compute must not touch widgets or artists; it returns whatever apply
+    needs to update them.
+
+    submit() and cancel() are called from the GUI thread; workers only read the current
+    generation. One worker thread: a superseded computation only runs until its next
+    checkpoint, and the pure-Python parts would not run in parallel anyway.
+    """
+
+    def __init__(self, compute, apply, parent=None):
+        super().__init__(parent)
+        self.compute = compute
+        self.apply = apply
+        self.generation = 0
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals = _Signals(self)
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+        self._done = self.generation
+
+    @property
+    def busy(self) -> bool:
+        """True until the newest submitted state has been applied (or failed)."""
+        return self._done != self.generation
+
+    def submit(self, state) -> int:
+        self.generation += 1
+        generation = self.generation
+        # queued tasks of older generations would only cancel themselves
+        self._pool.clear()
+        self._pool.start(_Task(self, generation, state))
+        return generation
+
+    def cancel(self):
+        """Drop everything in flight; nothing more gets applied until the next submit()."""
+        self.generation += 1
+        self._done = self.generation
+        self._pool.clear()
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until the worker thread is idle (e.g. before shutting down)."""
+        return self._pool.waitForDone(msecs)
+
+    def _on_finished(self, generation: int, state, result):
+        if generation != self.generation:
+            return
+        self._done = generation
+        self.apply(state, result)
+
+    def _on_failed(self, generation: int, error: str):
+        if generation == self.generation:
+            self._done = generation
+        print(f"Background update failed:\n{error}", file=sys.stderr)
@@ -1,7 +1,7 @@
 from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QLabel
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
-from src.utils import load_bike_crash_data, filter_data
+from src.utils import get_crash_data, filter_data
 from src.visualization.severity_matrix import plot_severity_matrix, VALID_SURFACES, BAD_VALUES
 import pandas as pd
 
@@ -13,7 +13,7 @@ class SeverityMatrixWindow(QMainWindow):
         self.setWindowTitle("Road Risk Matrix — Injury Severity by Surface × Speed")
         self.resize(1200, 900)
 
-        self.df = load_bike_crash_data()
+        self.df = get_crash_data()
 
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
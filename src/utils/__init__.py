@@ -1,9 +1,32 @@
 from .data import load_bike_crash_data
+from .data import resolve_dataset_csv
 from .data import prepare_crash_geodata
 from .data import filter_data
+from .data import project_crash_coords, coords_bounds
+from .filters import BitmapIndex
+from .cube import CrashCountCube, RangeSumTable
+from .registry import DatasetRegistry, get_registry, get_crash_data, get_crash_coords, get_full_bounds
+from .views import FilteredView
+from .schema import apply_schema, memory_report, MONTH_ORDER, INJURY_ORDER
 
 __all__ = [
     "load_bike_crash_data",
+    "resolve_dataset_csv",
     "prepare_crash_geodata",
     "filter_data",
+    "project_crash_coords",
+    "coords_bounds",
+    "BitmapIndex",
+    "CrashCountCube",
+    "RangeSumTable",
+    "DatasetRegistry",
+    "get_registry",
+    "get_crash_data",
+    "get_crash_coords",
+    "get_full_bounds",
+    "FilteredView",
+    "apply_schema",
+    "memory_report",
+    "MONTH_ORDER",
+    "INJURY_ORDER",
 ]
\ No newline at end of file
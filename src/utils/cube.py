@@ -0,0 +1,167 @@
+# pre-aggregated crash counts over the dashboard's filter dimensions
+import numpy as np
+import pandas as pd
+
+from .filters import ANY, value_codes, value_range
+
+
+class RangeSumTable:
+    """
+    Inclusive 2D prefix sums over two ordered dimensions (hour x month in the dashboard)
+    with any number of trailing axes (e.g. severity, or severity x hex cell).
+
+    The count for any contiguous row range r0..r1 and column range c0..c1 is four
+    lookups (inclusion-exclusion), independent of the range widths and of the number
+    of rows the table was built from. Ranges are given as values and resolved against
+    row_values / col_values like the filter ranges (see value_range).
+    """
+
+    def __init__(self, counts: np.ndarray, row_values: list, col_values: list):
+        self.row_values = list(row_values)
+        self.col_values = list(col_values)
+        n_rows, n_cols = counts.shape[:2]
+        # zero row/column in front, so the lookups need no edge cases
+        self._table = np.zeros((n_rows + 1, n_cols + 1) + counts.shape[2:], dtype=np.int64)
+        self._table[1:, 1:] = counts.cumsum(axis=0).cumsum(axis=1)
+
+    @classmethod
+    def from_codes(cls, row_codes: np.ndarray, col_codes: np.ndarray, row_values: list,
+                   col_values: list, extra_codes: np.ndarray | None = None,
+                   n_extra: int = 1) -> "RangeSumTable":
+        """
+        Build from per-row codes (-1 = missing, left out), e.g. hour/month codes plus a
+        hex cell id as extra_codes for range-filtered per-cell counts.
+        """
+        n_rows, n_cols = len(row_values), len(col_values)
+        if extra_codes is None:
+            extra_codes = np.zeros(len(row_codes), dtype=np.int64)
+        keep = (row_codes >= 0) & (col_codes >= 0) & (extra_codes >= 0)
+        flat = np.ravel_multi_index((row_codes[keep], col_codes[keep], extra_codes[keep]),
+                                    (n_rows, n_cols, n_extra))
+        counts = np.bincount(flat, minlength=n_rows * n_cols * n_extra)
+        return cls(counts.reshape(n_rows, n_cols, n_extra), row_values, col_values)
+
+    def query(self, row_range: tuple, col_range: tuple) -> np.ndarray:
+        """Counts summed over the inclusive value ranges, shape = the trailing axes."""
+        r0, r1 = value_range(self.row_values, *row_range)
+        c0, c1 = value_range(self.col_values, *col_range)
+        if r1 < r0 or c1 < c0:
+            return np.zeros(self._table.shape[2:], dtype=np.int64)
+        t = self._table
+        return t[r1 + 1, c1 + 1] - t[r0, c1 + 1] - t[r1 + 1, c0] + t[r0, c0]
+
+
+class CrashCountCube:
+    """
+    Crash counts for every combination of a set of small categorical dimensions
+    (dropdown filters, hour, month) and one measure column (BikeInjury), built once.
+
+    Each dimension gets one extra trailing bucket for missing values, so "Any" on a
+    dimension counts every row, exactly like the row-based filters. Range predicates
+    (hour, month) only cover real values, which again matches the row-based filters.
+
+    If the full cube has at most dense_limit cells it is stored dense and queries are
+    array slicing; otherwise only the observed combinations are kept (sparse) and a
+    query scans those. Either way query cost depends on the number of categories /
+    combinations, not on the number of rows.
+    """
+
+    def __init__(self, df: pd.DataFrame, dimensions: list[str], measure: str = "BikeInjury",
+                 dense_limit: int = 2_000_000):
+        self.dimensions = list(dimensions)
+        self.measure = measure
+        self.levels = {}        # column -> values in code order (missing bucket not included)
+
+        codes = []
+        for col in self.dimensions + [measure]:
+            col_codes, values = value_codes(df[col])
+            col_codes = np.where(col_codes < 0, len(values), col_codes)
+            self.levels[col] = values
+            codes.append(col_codes)
+
+        self.shape = tuple(len(self.levels[c]) + 1 for c in self.dimensions + [measure])
+        flat = np.ravel_multi_index(codes, self.shape)
+
+        size = int(np.prod(self.shape, dtype=np.int64))
+        self.is_dense = size <= dense_limit
+        if self.is_dense:
+            self._dense = np.bincount(flat, minlength=size).reshape(self.shape)
+        else:
+            keys, counts = np.unique(flat, return_counts=True)
+            self._codes = np.stack(np.unravel_index(keys, self.shape), axis=1)
+            self._counts = counts
+
+    @property
+    def measure_values(self) -> list:
+        return self.levels[self.measure]
+
+    def _dimension_slices(self, equals: dict | None, ranges: dict | None) -> list[slice] | None:
+        """One slice per dimension (None if some predicate can't match anything)."""
+        slices = [slice(None)] * len(self.dimensions)
+        for col, value in (equals or {}).items():
+            if value is None or value == ANY:
+                continue
+            if value not in self.levels[col]:
+                return None
+            code = self.levels[col].index(value)
+            slices[self.dimensions.index(col)] = slice(code, code + 1)
+        for col, (lo, hi) in (ranges or {}).items():
+            i0, i1 = value_range(self.levels[col], lo, hi)
+            if i1 < i0:
+                return None
+            slices[self.dimensions.index(col)] = slice(i0, i1 + 1)
+        return slices
+
+    def aggregate(self, equals: dict | None = None, ranges: dict | None = None,
+                  keep: list[str] = ()) -> np.ndarray:
+        """
+        Counts of rows matching the predicates, summed over every dimension not in keep.
+        Returns an array of shape [buckets of each kept dimension..., measure buckets];
+        the last bucket of every axis is the missing-value bucket.
+        """
+        keep_axes = [self.dimensions.index(c) for c in keep]
+        out_shape = tuple(self.shape[a] for a in keep_axes) + (self.shape[-1],)
+        slices = self._dimension_slices(equals, ranges)
+        if slices is None:
+            return np.zeros(out_shape, dtype=np.int64)
+
+        if self.is_dense:
+            # slice, sum away the dropped dimensions, then pad kept axes back to full size
+            block = self._dense[tuple(slices)]
+            drop = tuple(a for a in range(len(self.dimensions)) if a not in keep_axes)
+            block = block.sum(axis=drop)
+            order = [sorted(keep_axes).index(a) for a in keep_axes] + [len(keep_axes)]
+            block = block.transpose(order)
+            out = np.zeros(out_shape, dtype=np.int64)
+            out[tuple(slices[a] for a in keep_axes)] = block
+            return out
+
+        mask = np.ones(len(self._counts), dtype=bool)
+        for axis, sl in enumerate(slices):
+            if sl.start is not None:
+                mask &= (self._codes[:, axis] >= sl.start) & (self._codes[:, axis] < sl.stop)
+        kept_codes = [self._codes[mask, a] for a in keep_axes] + [self._codes[mask, -1]]
+        flat = np.ravel_multi_index(kept_codes, out_shape)
+        counts = np.bincount(flat, weights=self._counts[mask], minlength=int(np.prod(out_shape)))
+        return counts.astype(np.int64).reshape(out_shape)
+
+    def counts(self, equals: dict | None = None, ranges: dict | None = None) -> pd.Series:
+        """
+        Matching crash count per measure value. The last entry (label None) counts rows
+        with a missing measure, so counts.sum() is the total number of matching crashes.
+        """
+        return pd.Series(self.aggregate(equals, ranges), index=self.measure_values + [None])
+
+    def range_table(self, equals: dict | None, row: str, col: str) -> RangeSumTable:
+        """
+        Prefix-sum table over the row x col dimensions (e.g. CrashHour x CrashMonth) x the
+        measure, for fixed equality filters on the other dimensions. Build it once per
+        dropdown state; every slider range is then a constant-time query.
+        """
+        counts = self.aggregate(equals, keep=[row, col])
+        # drop the missing buckets: range filters never match missing values
+        return RangeSumTable(counts[:-1, :-1], self.levels[row], self.levels[col])
+
+    def range_counts(self, table: RangeSumTable, row_range: tuple, col_range: tuple) -> pd.Series:
+        """Same result as counts() for the table's equality filters plus both ranges."""
+        return pd.Series(table.query(row_range, col_range), index=self.measure_values + [None])
@@ -1,33 +1,225 @@
 # functions for loading and manipulating data
-import kagglehub
 import pandas as pd
 import os
 
+from typing import TYPE_CHECKING
+
+import numpy as np
 import pandas as pd
-import geopandas as gpd
 
-def load_bike_crash_data() -> pd.DataFrame:
-    path = kagglehub.dataset_download("adityadesai13/11000-bike-crash-data")
+from .schema import apply_schema, arrow_schema, memory_report, USED_COLUMNS
+from .snapshot import read_snapshot, write_snapshot, read_arrow_snapshot, write_arrow_snapshot, SnapshotWriter
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+KAGGLE_DATASET = "adityadesai13/11000-bike-crash-data"
 
-    # Find the first CSV inside the downloaded directory
-    for f in os.listdir(path):
+# local dataset location (CSV file or directory containing one); overrides the Kaggle download
+DATA_SOURCE_ENV = "BIKE_CRASH_DATA"
+# set to 1 to open the dataset as a memory-mapped Arrow file by default
+MEMORY_MAP_ENV = "BIKE_CRASH_MEMORY_MAP"
+# stand-in directory checked before downloading: drop the dataset CSV into <repo>/data
+LOCAL_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
+
+def _find_dataset_csv(path: str) -> str:
+    """Return path itself if it is a CSV file, else the first CSV inside the directory."""
+    if os.path.isfile(path):
+        return path
+    for f in sorted(os.listdir(path)):
         if f.endswith(".csv"):
-            csv_path = os.path.join(path, f)
-            break
-    else:
-        raise FileNotFoundError("No CSV file found in downloaded dataset")
+            return os.path.join(path, f)
+    raise FileNotFoundError(f"No CSV file found in {path}")
+
+def _dir_has_csv(path: str) -> bool:
+    return os.path.isdir(path) and any(f.endswith(".csv") for f in os.listdir(path))
+
+def resolve_dataset_csv(source: str | None = None) -> str:
+    """
+    Find the dataset CSV without needing the network when a local copy exists. Checked in order:
+    the source argument, $BIKE_CRASH_DATA (each a CSV file or a directory holding one), the
+    stand-in directory LOCAL_DATA_DIR, and finally the Kaggle download (kagglehub).
+    """
+    source = source or os.environ.get(DATA_SOURCE_ENV)
+    if source:
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Dataset source {source!r} does not exist")
+        return _find_dataset_csv(source)
+
+    if _dir_has_csv(LOCAL_DATA_DIR):
+        return _find_dataset_csv(LOCAL_DATA_DIR)
+
+    import kagglehub
+
+    return _find_dataset_csv(kagglehub.dataset_download(KAGGLE_DATASET))
+
+# CSVs bigger than this are ingested in chunks even if no chunksize is given
+STREAMING_THRESHOLD_BYTES = 256 * 1024 * 1024
+DEFAULT_CHUNKSIZE = 250_000
+
+def load_bike_crash_data(
+    use_cache: bool = True,
+    report_memory: bool = False,
+    chunksize: int | None = None,
+    clip_to_bounds: bool = False,
+    source: str | None = None,
+    memory_map: bool | None = None,
+) -> pd.DataFrame:
+    """
+    Load the bike crash dataset with the compact dtypes from src.utils.schema. The first
+    load parses the CSV and writes a columnar snapshot (see src.utils.snapshot); later
+    loads read the snapshot back as long as the source CSV is unchanged. Pass
+    use_cache=False to always re-parse the CSV, and report_memory=True to print the
+    per-column memory saved by the schema when the CSV is parsed.
+
+    Large CSVs (over STREAMING_THRESHOLD_BYTES, or whenever chunksize is given) are
+    streamed chunk by chunk instead, see stream_crash_csv. clip_to_bounds=True drops
+    rows without coordinates inside LAT_BOUNDS/LON_BOUNDS at ingest; such a frame only
+    suits the map views, so it is cached as a separate snapshot.
+
+    The CSV is located by resolve_dataset_csv(source), so a local path or $BIKE_CRASH_DATA
+    works offline. With memory_map=True (default: $BIKE_CRASH_MEMORY_MAP=1) the frame is
+    served from a memory-mapped Arrow copy of the snapshot; only its null-free numeric
+    columns are shared between processes through the page cache, the categorical
+    columns are still per-process copies (see read_arrow_snapshot).
+    """
+    csv_path = resolve_dataset_csv(source)
+    variant = "clipped" if clip_to_bounds else ""
+
+    if memory_map is None:
+        memory_map = os.environ.get(MEMORY_MAP_ENV, "") not in ("", "0")
+    if memory_map and use_cache:
+        df = read_arrow_snapshot(csv_path, variant=variant)
+        if df is not None:
+            return df
+        df = load_bike_crash_data(use_cache, report_memory, chunksize, clip_to_bounds, csv_path, memory_map=False)
+        if write_arrow_snapshot(df, csv_path, variant=variant) is not None:
+            mapped = read_arrow_snapshot(csv_path, variant=variant)
+            if mapped is not None:
+                return mapped
+        return df
+
+    if use_cache:
+        df = read_snapshot(csv_path, variant=variant)
+        if df is not None:
+            return df
+
+    if chunksize is None and os.path.getsize(csv_path) > STREAMING_THRESHOLD_BYTES:
+        chunksize = DEFAULT_CHUNKSIZE
+    if chunksize is not None:
+        return stream_crash_csv(csv_path, chunksize, clip_to_bounds, use_cache)
 
-    df = pd.read_csv(csv_path)
+    raw = pd.read_csv(csv_path)
+    if clip_to_bounds:
+        raw = raw[_in_bounds(raw)]
+    df = apply_schema(raw)
+    if report_memory:
+        print(memory_report(raw, df).to_string())
+    del raw
+
+    if use_cache:
+        write_snapshot(df, csv_path, variant=variant)
     return df
 
+def _iter_crash_chunks(csv_path: str, chunksize: int, clip_to_bounds: bool):
+    """Read csv_path in chunks of only the used columns, cleaned and schema-converted."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    usecols = [c for c in USED_COLUMNS if c in header]
+    for chunk in pd.read_csv(csv_path, usecols=usecols, chunksize=chunksize):
+        if clip_to_bounds:
+            chunk = chunk[_in_bounds(chunk)]
+        yield apply_schema(chunk[usecols], drop_unused=False)
+
+def stream_crash_csv(
+    csv_path: str,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    clip_to_bounds: bool = False,
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    """
+    Ingest a (possibly statewide, multi-year) crash CSV chunk by chunk: only USED_COLUMNS
+    are parsed, the bounds filter and dtype conversion run per chunk, and each chunk is
+    appended to the parquet snapshot straight away. The final frame is then read back
+    from the snapshot with categorical columns, so peak memory is about one raw chunk
+    plus the compact result rather than the whole raw CSV.
+    Without pyarrow (or with use_cache=False) the compact chunks are concatenated in memory.
+    """
+    variant = "clipped" if clip_to_bounds else ""
+    chunks = _iter_crash_chunks(csv_path, chunksize, clip_to_bounds)
+
+    if use_cache:
+        try:
+            header = pd.read_csv(csv_path, nrows=0).columns
+            schema = arrow_schema([c for c in USED_COLUMNS if c in header])
+            with SnapshotWriter(csv_path, schema, variant=variant) as writer:
+                for chunk in chunks:
+                    writer.write(chunk)
+        except (ImportError, OSError):
+            # no pyarrow / unwritable cache dir: fall back to the in-memory path below
+            chunks = _iter_crash_chunks(csv_path, chunksize, clip_to_bounds)
+        else:
+            df = read_snapshot(csv_path, variant=variant)
+            if df is not None:
+                return df
+            chunks = _iter_crash_chunks(csv_path, chunksize, clip_to_bounds)
+
+    # chunks have different categories, so those columns concatenate as objects;
+    # apply_schema turns them back into categoricals
+    df = pd.concat(list(chunks), ignore_index=True)
+    return apply_schema(df, drop_unused=False)
+
+def _in_bounds(df: pd.DataFrame, lat_col: str = "Latitude", lon_col: str = "Longitude") -> pd.Series:
+    """Rows with coordinates inside LAT_BOUNDS/LON_BOUNDS (NaN coordinates are never inside)."""
+    return df[lat_col].between(*LAT_BOUNDS) & df[lon_col].between(*LON_BOUNDS)
+
+# rough bounding box of North Carolina; crashes outside it are left off the maps
+LAT_BOUNDS = (33.5, 36.7)
+LON_BOUNDS = (-84.3, -75.2)
+
+# EPSG:3857 sphere radius
+_WEB_MERCATOR_RADIUS = 6378137.0
+
+def project_crash_coords(
+    df: pd.DataFrame,
+    lat_col: str = "Latitude",
+    lon_col: str = "Longitude",
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Project every row of df to Web Mercator (EPSG:3857) in one vectorized pass.
+    Returns contiguous float64 arrays (x, y) aligned positionally with df's rows; rows
+    with missing coordinates or outside LAT_BOUNDS/LON_BOUNDS are NaN, matching the rows
+    prepare_crash_geodata drops. Compute this once and index it with row selections
+    instead of rebuilding a GeoDataFrame per update.
+    """
+    lat = df[lat_col].to_numpy(dtype="float64", na_value=np.nan)
+    lon = df[lon_col].to_numpy(dtype="float64", na_value=np.nan)
+
+    with np.errstate(invalid="ignore"):
+        valid = (
+            (lat >= LAT_BOUNDS[0]) & (lat <= LAT_BOUNDS[1])
+            & (lon >= LON_BOUNDS[0]) & (lon <= LON_BOUNDS[1])
+        )
+
+    x = np.full(len(df), np.nan)
+    y = np.full(len(df), np.nan)
+    x[valid] = _WEB_MERCATOR_RADIUS * np.radians(lon[valid])
+    y[valid] = _WEB_MERCATOR_RADIUS * np.log(np.tan(np.pi / 4 + np.radians(lat[valid]) / 2))
+    return x, y
+
+def coords_bounds(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """[xmin, ymin, xmax, ymax] of projected coords, same layout as GeoDataFrame.total_bounds."""
+    return np.array([np.nanmin(x), np.nanmin(y), np.nanmax(x), np.nanmax(y)])
+
 def prepare_crash_geodata(
     df: pd.DataFrame,
     lat_col: str = "Latitude",
     lon_col: str = "Longitude",
-) -> gpd.GeoDataFrame:
+) -> "gpd.GeoDataFrame":
     """
     Take raw crash dataframe and return a GeoDataFrame in Web Mercator (EPSG:3857) for mapping.
     """
+    # geopandas (shapely, pyproj) is slow to import and only needed here
+    import geopandas as gpd
 
     df = df[df[lat_col].notna() & df[lon_col].notna()].copy()
 
@@ -41,8 +233,8 @@ def prepare_crash_geodata(
     # lon_min, lon_max = df["Longitude"].quantile([0.01, 0.99])
 
     # use full range of lat/lon in df
-    lat_min, lat_max = 33.5, 36.7
-    lon_min, lon_max = -84.3, -75.2
+    lat_min, lat_max = LAT_BOUNDS
+    lon_min, lon_max = LON_BOUNDS
 
     df = df[
         df[lat_col].between(lat_min, lat_max)
@@ -66,19 +258,21 @@ def filter_data(df: pd.DataFrame, column_name: str, choice: str) -> pd.DataFrame
     """
     Takes a dataframe, a column name to filter, and a choice to filter it on (categorical choice). Returns the filtered dataframe.
     """
-    df_filtered = df.copy()
     # Any choice doesn't need to filter
     yes_no_choices = ["CrashAlcoh", "HitRun"]
     if choice == "Any":
-        return df_filtered
+        return df.copy()
 
+    # boolean indexing already returns a new frame, so no up-front copy is needed
     # For Columns where the selection is baked into the choice window. Ex:LightCond, BikePos, TraffCntrl, SpeedLimit
     if column_name not in yes_no_choices:
-        df_filtered = df_filtered[df_filtered[column_name] == choice]
+        df_filtered = df[df[column_name] == choice]
     # For all columns whose choices are any, yes, no Ex:CrashAlcoh, HitRun
     elif choice == "Yes":
-        df_filtered = df_filtered[df_filtered[column_name] == "Yes"]
+        df_filtered = df[df[column_name] == "Yes"]
     elif choice == "No":
-        df_filtered = df_filtered[df_filtered[column_name] == "No"]
+        df_filtered = df[df[column_name] == "No"]
+    else:
+        df_filtered = df.copy()
 
     return df_filtered
\ No newline at end of file
@@ -0,0 +1,99 @@
+# bitmap index over the categorical filter columns, so filtering is a few bitwise ops
+import numpy as np
+import pandas as pd
+
+# filter value meaning "don't filter on this column"
+ANY = "Any"
+
+
+def value_codes(series: pd.Series) -> tuple[np.ndarray, list]:
+    """Integer code per row (-1 for missing) and the value belonging to each code."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), list(series.cat.categories)
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes, list(uniques)
+
+
+def value_range(values: list, lo, hi) -> tuple[int, int]:
+    """
+    Positions (first, last) in values covered by the inclusive range lo..hi. Numeric
+    values are compared by value, anything else (e.g. month names) by position.
+    last < first means the range is empty.
+    """
+    if all(isinstance(v, (int, float, np.integer, np.floating)) for v in values):
+        ordered = np.asarray(values)
+        return int(np.searchsorted(ordered, lo, "left")), int(np.searchsorted(ordered, hi, "right")) - 1
+    return values.index(lo), values.index(hi)
+
+
+class BitmapIndex:
+    """
+    Precomputed row bitsets for filtering a fixed frame.
+
+    For every (column, value) there is one packed bitset (np.packbits, 1 bit per row).
+    Equality filters AND those bitsets together. Range columns (hour, month) also keep
+    cumulative "value <= v" bitsets, so any range lo..hi is le[hi] & ~le[lo - 1]
+    regardless of its width. Ranges follow the column's category order (e.g. month
+    order for CrashMonth) or numeric order.
+
+    select() returns the matching row positions, usable with df.iloc / df.take or any
+    array aligned with the frame (e.g. the registry's projected coords).
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: list[str], range_columns: list[str] = ()):
+        self.n_rows = len(df)
+        self._all = np.packbits(np.ones(self.n_rows, dtype=bool))
+        self._none = np.zeros_like(self._all)
+
+        self._eq = {}           # column -> {value: packed bitset}
+        self._le = {}           # column -> (values in order, [packed "<= values[i]" bitsets])
+        for col in dict.fromkeys(list(columns) + list(range_columns)):
+            codes, values = value_codes(df[col])
+            eq = {value: np.packbits(codes == i) for i, value in enumerate(values)}
+            self._eq[col] = eq
+
+            if col in range_columns:
+                cumulative = []
+                running = self._none
+                for value in values:
+                    running = running | eq[value]
+                    cumulative.append(running)
+                self._le[col] = (values, cumulative)
+
+    def values(self, column: str) -> list:
+        return list(self._eq[column])
+
+    def equals(self, column: str, value) -> np.ndarray:
+        """Packed bitset of rows where column == value (all rows for "Any")."""
+        if value is None or value == ANY:
+            return self._all
+        return self._eq[column].get(value, self._none)
+
+    def between(self, column: str, lo, hi) -> np.ndarray:
+        """Packed bitset of rows with lo <= column <= hi (inclusive, in the column's order)."""
+        values, cumulative = self._le[column]
+        i0, i1 = value_range(values, lo, hi)
+        if i1 < i0:
+            return self._none
+        bits = cumulative[i1]
+        if i0 > 0:
+            bits = bits & ~cumulative[i0 - 1]
+        return bits
+
+    def select_bits(self, equals: dict | None = None, ranges: dict | None = None) -> np.ndarray:
+        """AND of all equality ({column: value}) and range ({column: (lo, hi)}) predicates."""
+        bits = self._all
+        for column, value in (equals or {}).items():
+            if value is None or value == ANY:
+                continue
+            bits = bits & self.equals(column, value)
+        for column, (lo, hi) in (ranges or {}).items():
+            bits = bits & self.between(column, lo, hi)
+        return bits
+
+    def to_positions(self, bits: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
+
+    def select(self, equals: dict | None = None, ranges: dict | None = None) -> np.ndarray:
+        """Row positions matching all predicates, see select_bits."""
+        return self.to_positions(self.select_bits(equals, ranges))
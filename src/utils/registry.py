@@ -0,0 +1,85 @@
+# process-wide registry so every window/plot shares one copy of the crash dataset
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .data import load_bike_crash_data, project_crash_coords, coords_bounds
+
+
+class DatasetRegistry:
+    """
+    Loads the crash dataset lazily on first use and keeps derived artifacts (projected
+    coordinates, map bounds, indexes, ...) next to it, so opening more dashboards does
+    not load more copies.
+
+    data() hands out shallow views: they share the underlying column arrays, so callers
+    may add/replace columns on their view but must not modify values in place.
+    """
+
+    def __init__(self, loader=load_bike_crash_data):
+        self._loader = loader
+        self._lock = threading.RLock()
+        self._df = None
+        self._artifacts = {}
+
+    def _frame(self) -> pd.DataFrame:
+        with self._lock:
+            if self._df is None:
+                self._df = self._loader()
+            return self._df
+
+    def data(self) -> pd.DataFrame:
+        """Shared read-only view of the full dataset."""
+        return self._frame().copy(deep=False)
+
+    def is_loaded(self) -> bool:
+        return self._df is not None
+
+    def artifact(self, name: str, builder):
+        """
+        Return the artifact stored under name, building it with builder(df) on first
+        request. Numpy arrays (also inside tuples) are marked read-only before sharing.
+        """
+        with self._lock:
+            if name not in self._artifacts:
+                value = builder(self._frame())
+                for arr in value if isinstance(value, tuple) else (value,):
+                    if isinstance(arr, np.ndarray):
+                        arr.flags.writeable = False
+                self._artifacts[name] = value
+            return self._artifacts[name]
+
+    def coords(self) -> tuple[np.ndarray, np.ndarray]:
+        """Web Mercator (x, y) per row, see project_crash_coords."""
+        return self.artifact("coords", project_crash_coords)
+
+    def full_bounds(self) -> np.ndarray:
+        """[xmin, ymin, xmax, ymax] of all mappable crashes, so maps keep a fixed extent."""
+        return self.artifact("full_bounds", lambda df: coords_bounds(*self.coords()))
+
+    def clear(self):
+        """Drop the dataset and all artifacts; the next access reloads."""
+        with self._lock:
+            self._df = None
+            self._artifacts = {}
+
+
+_registry = DatasetRegistry()
+
+
+def get_registry() -> DatasetRegistry:
+    return _registry
+
+
+def get_crash_data() -> pd.DataFrame:
+    """Shared view of the crash dataset (loaded on first call)."""
+    return _registry.data()
+
+
+def get_crash_coords() -> tuple[np.ndarray, np.ndarray]:
+    return _registry.coords()
+
+
+def get_full_bounds() -> np.ndarray:
+    return _registry.full_bounds()
@@ -0,0 +1,122 @@
+# explicit dtype schema for the crash dataset, applied once at ingest
+import pandas as pd
+
+MONTH_ORDER = ["January", "February", "March", "April", "May", "June", "July",
+               "August", "September", "October", "November", "December"]
+
+INJURY_ORDER = ["O: No Injury", "C: Possible Injury", "B: Suspected Minor Injury",
+                "A: Suspected Serious Injury", "K: Killed", "Unknown Injury"]
+
+# columns with a meaningful order; any unexpected values found in the data are appended at the end
+ORDERED_CATEGORIES = {
+    "CrashMonth": MONTH_ORDER,
+    "BikeInjury": INJURY_ORDER,
+    "CrashSevr": INJURY_ORDER,
+}
+
+# columns stored as unordered categoricals (categories taken from the data, sorted)
+CATEGORICAL_COLUMNS = [
+    # dashboard filters (src/app/app.py)
+    "CrashAlcoh", "HitRun", "LightCond", "BikePos", "TraffCntrl", "SpeedLimit",
+    # dashboard info box
+    "BikeAgeGrp", "DrvrAgeGrp", "BikeDir", "CrashLoc", "CrashGrp", "DrvrVehTyp", "DrvrAlcFlg",
+    # small multiples / severity matrix
+    "BikeSex", "RuralUrban", "BikeAlcFlg", "RdFeature", "RdSurface",
+]
+
+# small integer columns, downcast to the narrowest type that fits
+INTEGER_COLUMNS = ["CrashHour", "CrashYear"]
+
+# fixed widths for the integer columns when the data is streamed in chunks (see arrow_schema)
+INTEGER_WIDTHS = {"CrashHour": "int8", "CrashYear": "int16"}
+
+FLOAT_COLUMNS = ["Latitude", "Longitude"]
+
+# every column read by some view; everything else is dropped at ingest
+USED_COLUMNS = list(ORDERED_CATEGORIES) + CATEGORICAL_COLUMNS + INTEGER_COLUMNS + FLOAT_COLUMNS
+
+
+def _categorical_dtype(series: pd.Series, order: list[str] | None) -> pd.CategoricalDtype:
+    observed = series.dropna().unique()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        observed = [c for c in series.cat.categories if c in set(observed)]
+    if order is None:
+        return pd.CategoricalDtype(sorted(observed, key=str))
+    extra = sorted((v for v in observed if v not in order), key=str)
+    return pd.CategoricalDtype(list(order) + extra, ordered=True)
+
+
+def _to_categorical(series: pd.Series, dtype: pd.CategoricalDtype) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # astype() ignores category order for unordered dtypes, so reorder explicitly
+        return series.cat.set_categories(dtype.categories, ordered=dtype.ordered)
+    return series.astype(dtype)
+
+
+def _downcast_integer(series: pd.Series) -> pd.Series:
+    if series.isna().any():
+        # keep missing values, but in a nullable small int instead of float64
+        values = pd.to_numeric(series, downcast="integer")
+        if values.isna().all():
+            return values.astype("Int8")
+        small = pd.to_numeric(values.dropna(), downcast="integer").dtype
+        return values.astype(str(small).capitalize())
+    return pd.to_numeric(series, downcast="integer")
+
+
+def apply_schema(df: pd.DataFrame, drop_unused: bool = True) -> pd.DataFrame:
+    """
+    Convert the raw crash frame to compact dtypes: categoricals for every filter /
+    label column (fixed order for months and injury levels), small ints for hour and
+    year. With drop_unused=True, columns that no view reads are dropped.
+    Safe to call on an already converted frame.
+    """
+    if drop_unused:
+        df = df[[c for c in USED_COLUMNS if c in df.columns]]
+
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if col in ORDERED_CATEGORIES:
+            converted[col] = _to_categorical(series, _categorical_dtype(series, ORDERED_CATEGORIES[col]))
+        elif col in CATEGORICAL_COLUMNS:
+            converted[col] = _to_categorical(series, _categorical_dtype(series, None))
+        elif col in INTEGER_COLUMNS:
+            converted[col] = _downcast_integer(series)
+        else:
+            converted[col] = series
+
+    return pd.DataFrame(converted, index=df.index)
+
+
+def arrow_schema(columns: list[str]):
+    """
+    Fixed pyarrow schema for streaming chunks of the schema-converted frame to disk.
+    Categorical columns are stored as strings (dictionary-encoded by the writer), because
+    every chunk discovers its own categories; apply_schema restores them after reading.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for col in columns:
+        if col in ORDERED_CATEGORIES or col in CATEGORICAL_COLUMNS:
+            fields.append(pa.field(col, pa.string()))
+        elif col in INTEGER_COLUMNS:
+            fields.append(pa.field(col, pa.from_numpy_dtype(INTEGER_WIDTHS[col])))
+        else:
+            fields.append(pa.field(col, pa.float64()))
+    return pa.schema(fields)
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Per-column memory (bytes, deep) of two frames, e.g. before/after apply_schema."""
+    report = pd.DataFrame({
+        "before": before.memory_usage(index=False, deep=True),
+        "after": after.memory_usage(index=False, deep=True),
+    })
+    report["after"] = report["after"].fillna(0).astype("int64")
+    report["dtype_before"] = before.dtypes.astype(str)
+    report["dtype_after"] = after.dtypes.astype(str).reindex(report.index).fillna("dropped")
+    report.loc["TOTAL", ["before", "after"]] = report[["before", "after"]].sum()
+    report[["before", "after"]] = report[["before", "after"]].astype("int64")
+    return report
@@ -0,0 +1,265 @@
+# on-disk columnar snapshots of the crash dataset, so we only parse the CSV once
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from .schema import apply_schema
+
+# bump whenever the snapshot layout or the columns/dtypes written to it change
+SNAPSHOT_VERSION = 3
+
+CACHE_DIR_ENV = "BIKE_CRASH_CACHE_DIR"
+_DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "bike-crash-viz")
+
+
+def get_cache_dir() -> str:
+    """Directory holding dataset snapshots (override with $BIKE_CRASH_CACHE_DIR)."""
+    return os.environ.get(CACHE_DIR_ENV, _DEFAULT_CACHE_DIR)
+
+
+def _snapshot_paths(csv_path: str, cache_dir: str | None = None, variant: str = "",
+                    fmt: str = "parquet") -> tuple[str, str]:
+    """
+    Return (data_path, meta_path) of the snapshot belonging to csv_path. variant keeps
+    differently cleaned snapshots of the same CSV apart (e.g. "clipped"); fmt is
+    "parquet" or "arrow" (see write_arrow_snapshot).
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    csv_path = os.path.abspath(csv_path)
+    # the same file name can come from different dataset versions, so key on the full path too
+    key = hashlib.sha1(csv_path.encode("utf-8")).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    base = os.path.join(cache_dir, f"{stem}-{key}" + (f"-{variant}" if variant else ""))
+    if fmt == "parquet":
+        return base + ".parquet", base + ".json"
+    return f"{base}.{fmt}", f"{base}.{fmt}.json"
+
+
+def _file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_fingerprint(csv_path: str, with_hash: bool = True) -> dict:
+    stat = os.stat(csv_path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        fingerprint["sha256"] = _file_sha256(csv_path)
+    return fingerprint
+
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _snapshot_is_valid(csv_path: str, meta: dict) -> bool:
+    """
+    Check a snapshot's metadata against the current source file. Size and mtime are
+    checked first; the (slow) content hash is only computed when the mtime moved but
+    the size did not, e.g. after the dataset was re-extracted with identical content.
+    """
+    if meta.get("version") != SNAPSHOT_VERSION:
+        return False
+
+    source = meta.get("source", {})
+    current = _source_fingerprint(csv_path, with_hash=False)
+    if current["size"] != source.get("size"):
+        return False
+    if current["mtime_ns"] == source.get("mtime_ns"):
+        return True
+    return _file_sha256(csv_path) == source.get("sha256")
+
+
+def _read_valid_meta(csv_path: str, data_path: str, meta_path: str) -> dict | None:
+    """Snapshot metadata if the snapshot exists and still matches csv_path, else None."""
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not _snapshot_is_valid(csv_path, meta):
+        return None
+    return meta
+
+
+def read_snapshot(csv_path: str, cache_dir: str | None = None, variant: str = "") -> pd.DataFrame | None:
+    """Return the cached frame for csv_path, or None if there is no valid snapshot."""
+    if not _parquet_available():
+        return None
+
+    data_path, meta_path = _snapshot_paths(csv_path, cache_dir, variant)
+    meta = _read_valid_meta(csv_path, data_path, meta_path)
+    if meta is None:
+        return None
+
+    try:
+        import pyarrow.parquet as pq
+
+        # streamed snapshots store categoricals as plain (dictionary-encoded) strings;
+        # read those straight into dictionaries so they never become Python strings
+        table = pq.read_table(data_path, read_dictionary=meta.get("dictionary_columns") or None)
+        df = table.to_pandas()
+    except Exception:
+        # a truncated or unreadable snapshot is just a cache miss
+        return None
+
+    if meta.get("streamed"):
+        # category orders / int widths were only fixed per chunk while streaming
+        df = apply_schema(df, drop_unused=False)
+    return df
+
+
+def _snapshot_meta(csv_path: str, rows: int, **extra) -> dict:
+    return {
+        "version": SNAPSHOT_VERSION,
+        "source": {"path": os.path.abspath(csv_path), **_source_fingerprint(csv_path)},
+        "rows": rows,
+        **extra,
+    }
+
+
+def write_snapshot(df: pd.DataFrame, csv_path: str, cache_dir: str | None = None,
+                   variant: str = "") -> str | None:
+    """
+    Write df as the snapshot for csv_path and return its path. Returns None (and leaves
+    the cache untouched) if parquet support is not installed or the cache dir is not writable.
+    """
+    if not _parquet_available():
+        return None
+
+    data_path, meta_path = _snapshot_paths(csv_path, cache_dir, variant)
+    meta = _snapshot_meta(csv_path, len(df))
+
+    try:
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        # write to temp files first so a crash never leaves a half-written snapshot behind
+        df.to_parquet(data_path + ".tmp", index=False)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(data_path + ".tmp", data_path)
+        os.replace(meta_path + ".tmp", meta_path)
+    except OSError:
+        return None
+    return data_path
+
+
+def read_arrow_snapshot(csv_path: str, cache_dir: str | None = None, variant: str = "") -> pd.DataFrame | None:
+    """
+    Open the Arrow IPC snapshot of csv_path memory-mapped, or return None if there is no
+    valid one. Only numeric columns without missing values stay backed by the mapped
+    file (shared through the OS page cache between processes on the same host); the
+    categorical columns come back as pandas Categoricals, whose codes are private copies
+    (one byte per row each), and columns with nulls are copied too.
+    """
+    if not _parquet_available():
+        return None
+
+    data_path, meta_path = _snapshot_paths(csv_path, cache_dir, variant, fmt="arrow")
+    if _read_valid_meta(csv_path, data_path, meta_path) is None:
+        return None
+
+    try:
+        import pyarrow as pa
+
+        table = pa.ipc.open_file(pa.memory_map(data_path, "r")).read_all()
+        # split_blocks lets null-free numeric columns stay zero-copy views of the mapped
+        # buffers; dictionary columns are converted (copied) into Categoricals
+        return table.to_pandas(split_blocks=True)
+    except Exception:
+        return None
+
+
+def write_arrow_snapshot(df: pd.DataFrame, csv_path: str, cache_dir: str | None = None,
+                         variant: str = "") -> str | None:
+    """
+    Write df as an uncompressed Arrow IPC (Feather v2) file that read_arrow_snapshot can
+    memory-map. Returns its path, or None if pyarrow is missing / the cache is not writable.
+    """
+    if not _parquet_available():
+        return None
+    import pyarrow as pa
+
+    data_path, meta_path = _snapshot_paths(csv_path, cache_dir, variant, fmt="arrow")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    try:
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        with pa.OSFile(data_path + ".tmp", "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(_snapshot_meta(csv_path, len(df)), f, indent=2)
+        os.replace(data_path + ".tmp", data_path)
+        os.replace(meta_path + ".tmp", meta_path)
+    except OSError:
+        return None
+    return data_path
+
+
+class SnapshotWriter:
+    """
+    Writes the snapshot for csv_path incrementally, one chunk (DataFrame) at a time,
+    so a large CSV never has to be in memory as a whole. All chunks are cast to the
+    given pyarrow schema; string columns are dictionary-encoded on disk and read back
+    as categoricals. Nothing becomes visible to read_snapshot until close().
+
+        with SnapshotWriter(csv_path, arrow_schema) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, csv_path: str, arrow_schema, cache_dir: str | None = None, variant: str = ""):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.csv_path = csv_path
+        self.schema = arrow_schema
+        self.rows = 0
+        self.path, self._meta_path = _snapshot_paths(csv_path, cache_dir, variant)
+        self._dictionary_columns = [f.name for f in arrow_schema if pa.types.is_string(f.type)]
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._writer = pq.ParquetWriter(self.path + ".tmp", arrow_schema,
+                                        use_dictionary=self._dictionary_columns)
+
+    def write(self, chunk: pd.DataFrame):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        self._writer.write_table(table.select(self.schema.names).cast(self.schema))
+        self.rows += len(chunk)
+
+    def close(self) -> str:
+        self._writer.close()
+        meta = _snapshot_meta(self.csv_path, self.rows, streamed=True,
+                              dictionary_columns=self._dictionary_columns)
+        with open(self._meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(self.path + ".tmp", self.path)
+        os.replace(self._meta_path + ".tmp", self._meta_path)
+        return self.path
+
+    def abort(self):
+        self._writer.close()
+        if os.path.exists(self.path + ".tmp"):
+            os.remove(self.path + ".tmp")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
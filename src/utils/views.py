@@ -0,0 +1,58 @@
+# lazy, column-projected views over a row selection of a shared frame
+import numpy as np
+import pandas as pd
+
+
+class FilteredView:
+    """
+    A row selection of a frame restricted to a declared set of columns. Nothing is
+    copied up front: each column is gathered from the source frame the first time it
+    is read and then kept, so a consumer only pays for the columns it touches.
+
+        view = FilteredView(df, selection, ["BikeInjury"])
+        view["BikeInjury"].value_counts()
+
+    selection is an array of row positions (as returned by BitmapIndex.select) or None
+    for all rows. Reading a column that was not declared raises KeyError, which keeps
+    the column lists each view declares honest.
+    """
+
+    def __init__(self, df: pd.DataFrame, selection: np.ndarray | None, columns: list[str]):
+        missing = [c for c in columns if c not in df.columns]
+        if missing:
+            raise KeyError(f"columns not in frame: {missing}")
+        self._df = df
+        self._selection = selection
+        self.columns = list(columns)
+        self._cache = {}
+
+    def __len__(self) -> int:
+        return len(self._df) if self._selection is None else len(self._selection)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    @property
+    def selection(self) -> np.ndarray | None:
+        return self._selection
+
+    def __getitem__(self, column: str) -> pd.Series:
+        if column not in self.columns:
+            raise KeyError(f"{column!r} was not declared for this view (declared: {self.columns})")
+        if column not in self._cache:
+            series = self._df[column]
+            if self._selection is not None:
+                series = series.take(self._selection)
+            self._cache[column] = series
+        return self._cache[column]
+
+    def project(self, columns: list[str]) -> "FilteredView":
+        """A view on the same rows with a (smaller) column subset; shares materialized columns."""
+        view = FilteredView(self._df, self._selection, columns)
+        view._cache = {c: s for c, s in self._cache.items() if c in columns}
+        return view
+
+    def to_frame(self) -> pd.DataFrame:
+        """Materialize all declared columns as a DataFrame."""
+        return pd.DataFrame({c: self[c] for c in self.columns})
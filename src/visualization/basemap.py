@@ -0,0 +1,118 @@
+# basemap rasters kept in memory, so redraws don't re-fetch, re-decode or re-warp tiles
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from src.visualization.tiles import source_key, tile_mosaic
+
+# URL template ("http://host/{z}/{x}/{y}.png") replacing every basemap style, e.g. a
+# local tile server on air-gapped nodes
+TILE_URL_ENV = "BIKE_CRASH_TILE_URL"
+
+# (source, extent, zoom) -> [image, image extent, last AxesImage drawn from it]
+_BASEMAP_CACHE = OrderedDict()
+MAX_CACHED_BASEMAPS = 16
+
+
+def get_basemap_source(style: str, dark_mode: bool = False):
+    """Small helper to choose ArcGIS basemap."""
+    # If dark mode is enabled, use dark basemap
+    # if dark_mode:
+    #     return providers.CartoDB.DarkMatter
+    if os.environ.get(TILE_URL_ENV):
+        return os.environ[TILE_URL_ENV]
+
+    # ctx.providers is xyzservices' registry; importing contextily itself (rasterio, ...)
+    # just to look up a provider costs more than the rest of startup
+    from xyzservices import providers
+
+    style = style.lower()
+    if style in ("street", "streets"):
+        return providers.Esri.WorldStreetMap
+    if style in ("gray", "grey", "lightgray", "light"):
+        return providers.Esri.WorldGrayCanvas
+    if style in ("topo", "topographic"):
+        return providers.Esri.WorldTopoMap
+    return providers.Esri.WorldStreetMap  # default
+
+
+def _basemap_key(source, extent, zoom) -> tuple:
+    # round so float noise in the limits doesn't defeat the cache (1 mm in EPSG:3857)
+    return (source_key(source), tuple(round(float(v), 3) for v in extent), zoom)
+
+
+def get_basemap_image(source, extent, zoom="auto") -> tuple[np.ndarray, tuple]:
+    """
+    Basemap raster covering extent = (xmin, xmax, ymin, ymax) in EPSG:3857, and the
+    raster's own extent. Stitched from the persistent tile store (see tiles.tile_mosaic)
+    on first use and kept in memory (least recently used rasters are dropped beyond
+    MAX_CACHED_BASEMAPS).
+    """
+    key = _basemap_key(source, extent, zoom)
+    entry = _BASEMAP_CACHE.get(key)
+    if entry is None:
+        img, img_extent = tile_mosaic(source, extent, zoom)
+        entry = [img, img_extent, None]
+        _BASEMAP_CACHE[key] = entry
+        while len(_BASEMAP_CACHE) > MAX_CACHED_BASEMAPS:
+            _BASEMAP_CACHE.popitem(last=False)
+    _BASEMAP_CACHE.move_to_end(key)
+    return entry[0], entry[1]
+
+
+def _reattach(image, ax) -> bool:
+    """Move a cached AxesImage whose axes was cleared onto ax. False if it is still in use."""
+    old_ax = image.axes
+    if old_ax is ax and image in ax.images:
+        return True
+    if old_ax is not None and image in old_ax.images:
+        # still shown on another live axes, don't steal it
+        return False
+    if image.figure is not None and image.figure is not ax.figure:
+        return False
+    image.axes = None
+    image.set_transform(ax.transData)
+    ax.add_image(image)
+    return True
+
+
+def add_basemap(ax, source, extent=None, zoom="auto", **imshow_kwargs):
+    """
+    Drop-in for ctx.add_basemap for axes already in EPSG:3857: draws the cached raster
+    for (source, extent, zoom) and keeps the axis limits. extent defaults to the current
+    axis limits. If the raster's image artist from an earlier draw is free (its axes was
+    cleared) it is reattached instead of creating a new one; calling this again on an
+    axes that already shows the same basemap is a no-op.
+    """
+    if extent is None:
+        extent = (*ax.get_xlim(), *ax.get_ylim())
+    key = _basemap_key(source, extent, zoom)
+
+    current = getattr(ax, "_basemap", None)
+    if current is not None and current[0] == key and current[1] in ax.images:
+        return current[1]
+    if current is not None and current[1] in ax.images:
+        current[1].remove()
+
+    img, img_extent = get_basemap_image(source, extent, zoom)
+    entry = _BASEMAP_CACHE[key]
+    xlim, ylim = ax.get_xlim(), ax.get_ylim()
+
+    image = entry[2]
+    if image is None or not _reattach(image, ax):
+        image = ax.imshow(img, extent=img_extent, interpolation="bilinear", **imshow_kwargs)
+        entry[2] = image
+    else:
+        image.set(**imshow_kwargs)
+        ax.set_aspect("equal")
+
+    # like ctx.add_basemap(reset_extent=True): the raster must not change the view
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+    ax._basemap = (key, image)
+    return image
+
+
+def clear_basemap_cache():
+    _BASEMAP_CACHE.clear()
@@ -0,0 +1,138 @@
+# the dashboard's data queries and severity histogram, shared by the Qt app and headless reports
+import matplotlib.cm as cm
+import matplotlib.colors as mcolors
+import matplotlib.ticker as mtick
+import numpy as np
+import pandas as pd
+
+from src.utils import BitmapIndex, CrashCountCube, INJURY_ORDER, get_registry
+
+# columns behind the dropdown filters
+FILTER_COLUMNS = ["CrashAlcoh", "HitRun", "LightCond", "BikePos", "TraffCntrl", "SpeedLimit"]
+RANGE_COLUMNS = ["CrashHour", "CrashMonth"]
+
+# columns the info box reads from the filtered rows; the histogram is answered by the
+# count cube and the heatmap reads the registry's projected coords and injury array
+INFO_COLUMNS = ["BikeAgeGrp", "DrvrAgeGrp", "BikeDir", "CrashLoc", "CrashGrp", "DrvrVehTyp",
+                "DrvrAlcFlg", "HitRun"]
+
+PRETTY_INJURY_LABELS = {
+    "O: No Injury": "No Injury",
+    "C: Possible Injury": "Possible Injury",
+    "B: Suspected Minor Injury": "Suspected Minor Injury",
+    "A: Suspected Serious Injury": "Suspected Serious Injury",
+    "K: Killed": "Killed",
+    "Unknown Injury": "Unknown Injury"
+}
+
+
+def dashboard_artifacts(registry=None):
+    """
+    (injury array, bitmap index, count cube) behind the dashboard, built once per
+    process as registry artifacts, so every window and report worker shares them.
+    """
+    registry = registry or get_registry()
+    # kept categorical, so the heatmap gets severity codes in INJURY_ORDER for free
+    injuries = registry.artifact("injuries", lambda df: df["BikeInjury"].array)
+    filter_index = registry.artifact("dashboard_index", lambda df: BitmapIndex(
+        df, FILTER_COLUMNS, range_columns=RANGE_COLUMNS))
+    count_cube = registry.artifact("dashboard_cube", lambda df: CrashCountCube(
+        df, FILTER_COLUMNS + RANGE_COLUMNS, measure="BikeInjury"))
+    return injuries, filter_index, count_cube
+
+
+def is_dark_mode(lightcond_choice: str) -> bool:
+    """The dashboard switches to dark mode for the "Dark - ..." light conditions."""
+    return "dark" in lightcond_choice.lower() if lightcond_choice != "Any" else False
+
+
+def range_texts(hours: tuple[int, int], months: tuple[str, str]) -> tuple[str, str]:
+    """Slider labels: "0 - 23" and "Jan-Dec"."""
+    return f"{hours[0]} - {hours[1]}", f"{months[0][:3]}-{months[1][:3]}"
+
+
+def adjusted_colormap(cmap, minval=0, maxval=1.0, n=100):
+    return mcolors.LinearSegmentedColormap.from_list(
+        f'trunc({cmap.name},{minval:.2f},{maxval:.2f})',
+        cmap(np.linspace(minval, maxval, n))
+    )
+
+
+class SeverityHistogram:
+    """
+    The dashboard's severity histogram: share of the matching crashes per injury level.
+
+    The axes, the six bars, their colors and the tick labels are created once; update()
+    only sets bar heights (set_height), the y scale and the title, and the theme is
+    reapplied only when dark mode actually toggles. Call the canvas' draw afterwards.
+    """
+
+    def __init__(self, figure, dark_mode: bool = False):
+        self.figure = figure
+        self.injury_order = list(INJURY_ORDER)
+        self.ax = ax = figure.add_subplot(1, 1, 1)
+
+        #Red Color Map
+        cmap = adjusted_colormap(cm.YlOrRd, 0.3)
+        norm = mcolors.Normalize(vmin=0, vmax=len(self.injury_order) - 1)
+        colors = [cmap(norm(i)) for i in range(len(self.injury_order))]
+        self.bars = ax.bar(self.injury_order, [0] * len(self.injury_order), color=colors)
+
+        ax.set_xticks(range(len(self.injury_order)))
+        ax.set_xticklabels([PRETTY_INJURY_LABELS[label] for label in self.injury_order], rotation=25, ha="right", fontsize=8)
+        self.title = ax.set_title("")
+        ax.set_xlabel("Injury Severity")
+        ax.set_ylabel("Percentage of Accidents")
+        ax.yaxis.set_major_formatter(mtick.FormatStrFormatter('%.0f%%'))
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+
+        # shift hist up a to avoid cutting off category labels
+        figure.subplots_adjust(left=0.2, bottom=0.2)
+
+        self.dark_mode = None
+        self.set_dark_mode(dark_mode)
+
+    def set_dark_mode(self, dark_mode: bool):
+        """Restyle for dark/light mode; a no-op if the mode didn't change."""
+        if dark_mode == self.dark_mode:
+            return
+        self.dark_mode = dark_mode
+        ax = self.ax
+        if dark_mode:
+            face, text_color, grid_color = '#1a1a1a', 'white', "#797979"
+        else:
+            face, text_color, grid_color = 'white', 'black', '#cccccc'
+
+        self.figure.patch.set_facecolor(face)
+        ax.set_facecolor(face)
+        self.title.set_color(text_color)
+        ax.xaxis.label.set_color(text_color)
+        ax.yaxis.label.set_color(text_color)
+        # Set tick colors
+        ax.tick_params(colors=text_color)
+        for spine in ax.spines.values():
+            spine.set_color(text_color)
+
+        # Set grid color
+        ax.grid(True, alpha=0.3, color=grid_color)
+        # Use appropriate grid color based on dark mode
+        ax.yaxis.grid(True, linestyle='--', linewidth=0.7, color=grid_color, alpha=0.7)
+
+    def update(self, injury_counts: pd.Series, hours: tuple[int, int], months: tuple[str, str],
+               dark_mode: bool = False):
+        """Show injury_counts (as returned by the count cube) for the given slider ranges."""
+        self.set_dark_mode(dark_mode)
+
+        num_filtered = int(injury_counts.sum())
+        for bar, cat in zip(self.bars, self.injury_order):
+            bar.set_height(100 * injury_counts.get(cat, 0) / num_filtered if num_filtered else 0)
+        # rescale y to the new bars, like a freshly plotted axes
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+        time_choice_text, month_choice_text = range_texts(hours, months)
+        histogram_title = f"Bike Injury By Severity During {month_choice_text}"
+        if time_choice_text != "0 - 23":
+            histogram_title = f"Bike Injury By Severity During {month_choice_text} \n At Time {time_choice_text}"
+        self.title.set_text(histogram_title)
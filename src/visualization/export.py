@@ -0,0 +1,197 @@
+# animation export: frames rendered in parallel on headless Agg canvases, written in order
+import io
+import os
+import shutil
+import subprocess
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.visualization.basemap import get_basemap_image, get_basemap_source
+from src.visualization.heatmap import DensityFrames, draw_density_frame
+
+# file suffixes encoded by ffmpeg (must be on PATH); .gif goes through Pillow, no suffix = PNG directory
+FFMPEG_SUFFIXES = (".mp4", ".mkv", ".mov", ".webm", ".avi")
+
+
+class PngDirWriter:
+    """One frame_00000.png per frame in a directory."""
+
+    encoding = "png"
+
+    def __init__(self, path: str, fps: float, size: tuple[int, int]):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.index = 0
+
+    def write(self, data: bytes):
+        with open(os.path.join(self.path, f"frame_{self.index:05d}.png"), "wb") as f:
+            f.write(data)
+        self.index += 1
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+class GifWriter:
+    """
+    Animated GIF through Pillow. Workers already quantize frames to a palette (the slow
+    part); Pillow only writes a GIF once it has every frame, so they are kept here as
+    8-bit images until close().
+    """
+
+    encoding = "gif"
+
+    def __init__(self, path: str, fps: float, size: tuple[int, int]):
+        self.path = path
+        self.duration = int(round(1000 / fps))
+        self.frames = []
+
+    def write(self, data: bytes):
+        from PIL import Image
+
+        frame = Image.open(io.BytesIO(data))
+        frame.load()
+        self.frames.append(frame)
+
+    def close(self):
+        if self.frames:
+            self.frames[0].save(self.path, save_all=True, append_images=self.frames[1:],
+                                duration=self.duration, loop=0)
+        self.frames = []
+
+    def abort(self):
+        self.frames = []
+
+
+class FfmpegWriter:
+    """Pipes raw RGB frames into ffmpeg, which encodes while frames are still rendering."""
+
+    encoding = "rgb"
+
+    def __init__(self, path: str, fps: float, size: tuple[int, int]):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError(f"ffmpeg is needed to write {path} but was not found on PATH")
+        width, height = size
+        self.proc = subprocess.Popen(
+            [ffmpeg, "-y", "-loglevel", "error",
+             "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps),
+             "-i", "-",
+             # yuv420p needs even sizes
+             "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", path],
+            stdin=subprocess.PIPE)
+
+    def write(self, data: bytes):
+        self.proc.stdin.write(data)
+
+    def close(self):
+        self.proc.stdin.close()
+        if self.proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {self.proc.returncode}")
+
+    def abort(self):
+        self.proc.kill()
+        self.proc.wait()
+
+
+def writer_for(path: str):
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".gif":
+        return GifWriter
+    if suffix in FFMPEG_SUFFIXES:
+        return FfmpegWriter
+    if suffix == "":
+        return PngDirWriter
+    raise ValueError(f"don't know how to write {path!r}: use .gif, a video suffix {FFMPEG_SUFFIXES} "
+                     "or a directory for PNG frames")
+
+
+def _encode(canvas: FigureCanvasAgg, encoding: str) -> bytes:
+    from PIL import Image
+
+    rgb = np.asarray(canvas.buffer_rgba())[..., :3]
+    if encoding == "rgb":
+        return rgb.tobytes()
+    image = Image.fromarray(rgb)
+    if encoding == "gif":
+        image = image.quantize(256)
+    buf = io.BytesIO()
+    image.save(buf, "PNG")
+    return buf.getvalue()
+
+
+# per worker process: the figure is built once, then every task only updates and draws it
+_worker = None
+
+
+def _init_worker(frames: DensityFrames, basemap_style: str, figsize, dpi: float, encoding: str):
+    global _worker
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    update = draw_density_frame(fig, frames, basemap_style)
+    _worker = (canvas, update, encoding)
+
+
+def _render_frame(frame: int) -> bytes:
+    canvas, update, encoding = _worker
+    update(frame)
+    canvas.draw()
+    return _encode(canvas, encoding)
+
+
+def render_frames(frames: DensityFrames, basemap_style: str = "gray", figsize=(10, 10), dpi: float = 100,
+                  encoding: str = "png", workers: int = None):
+    """
+    Yield every frame of the density animation encoded as encoding ("png", "gif" = a
+    palette PNG, or "rgb" = raw bytes), in frame order. Frames render in a pool of
+    worker processes, each with its own headless figure; at most two frames per worker
+    are in flight, so memory stays flat however long the animation is.
+    """
+    workers = max(min(workers or os.cpu_count() or 1, len(frames)), 1)
+    # fetch the basemap once up front: forked workers inherit the raster, others find
+    # the tiles in the local tile store
+    xmin, xmax, ymin, ymax = frames.extent
+    get_basemap_image(get_basemap_source(basemap_style), (xmin, xmax, ymin, ymax), "auto")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(frames, basemap_style, figsize, dpi, encoding)) as pool:
+        pending = deque()
+        try:
+            for frame in range(len(frames)):
+                pending.append(pool.submit(_render_frame, frame))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def export_density_animation(frames: DensityFrames, path: str, basemap_style: str = "gray", figsize=(10, 10),
+                             dpi: float = 100, fps: float = 1, workers: int = None) -> str:
+    """
+    Render a density animation (see crash_density_frames) to path: an animated .gif, a
+    video (.mp4 etc. through ffmpeg) or, without a suffix, a directory of PNG frames.
+    Frames are rendered in parallel (render_frames) and streamed to the writer in
+    order, so export time scales with the available cores.
+    """
+    writer_cls = writer_for(path)
+    # the Agg canvas size in pixels
+    size = (int(figsize[0] * dpi), int(figsize[1] * dpi))
+    writer = writer_cls(path, fps, size)
+    try:
+        for data in render_frames(frames, basemap_style, figsize, dpi, writer_cls.encoding, workers):
+            writer.write(data)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return path
@@ -1,100 +1,230 @@
 # function(s) for plotting heatmap
 
+import threading
+from typing import TYPE_CHECKING
+
 import matplotlib.pyplot as plt
-from matplotlib import transforms
 from matplotlib.animation import FuncAnimation
+from matplotlib.colors import Normalize
 import matplotlib.cm as cm
-import contextily as ctx
-import geopandas as gpd
 import numpy as np
 import pandas as pd
-from src.utils import load_bike_crash_data, prepare_crash_geodata
-
-# get global sizes for map, so map does not change when changing filters
-_df_all = load_bike_crash_data()
-_gdf_all = prepare_crash_geodata(_df_all)
-FULL_BOUNDS = _gdf_all.total_bounds
-
-
-def _get_basemap_source(style: str, dark_mode: bool = False):
-    """Small helper to choose ArcGIS basemap."""
-    # If dark mode is enabled, use dark basemap
-    # if dark_mode:
-    #     return ctx.providers.CartoDB.DarkMatter
-    
-    style = style.lower()
-    if style in ("street", "streets"):
-        return ctx.providers.Esri.WorldStreetMap
-    if style in ("gray", "grey", "lightgray", "light"):
-        return ctx.providers.Esri.WorldGrayCanvas
-    if style in ("topo", "topographic"):
-        return ctx.providers.Esri.WorldTopoMap
-    return ctx.providers.Esri.WorldStreetMap  # default
+from src.utils import MONTH_ORDER, coords_bounds, get_full_bounds, get_registry, project_crash_coords
+from src.utils.filters import value_codes
+from src.visualization.basemap import add_basemap, get_basemap_source
+from src.visualization.hexgrid import HexGrid, HexPyramid
+from src.visualization.layers import LayeredCanvas
+from src.visualization.raster import aggregate_points, axes_pixel_shape, shade
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+
+
+def __getattr__(name):
+    # global map extent, so the map does not change when changing filters. Looked up
+    # on first use (the registry caches it): computing it at import loaded the dataset.
+    if name == "FULL_BOUNDS":
+        return get_full_bounds()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# plot_crash_points switches from markers to a pixel count image at this many points
+RASTER_MIN_POINTS = 20_000
 
 
 def plot_crash_points(
-    gdf_web: gpd.GeoDataFrame,
+    gdf_web: "gpd.GeoDataFrame" = None,
     basemap_style: str = "street",
     figsize=(8, 8),
     dark_mode: bool = False,
+    coords: tuple[np.ndarray, np.ndarray] = None,
+    selection: np.ndarray = None,
+    raster: bool = None,
+    how: str = "eq_hist",
+    cmap: str = "plasma",
 ):
-    """Plot crash points on an Esri basemap."""
-    fig, ax = plt.subplots(figsize=figsize)
-
-    gdf_web.plot(ax=ax, markersize=5, alpha=0.5)
-
-    ctx.add_basemap(ax, source=_get_basemap_source(basemap_style, dark_mode=dark_mode))
+    """
+    Plot crash points on an Esri basemap.
+
+    Takes gdf_web, or coords=(x, y) from project_crash_coords plus an optional row
+    selection like plot_crash_hexbin. With raster, the points are counted per screen
+    pixel and drawn as one shaded image (how = transfer function, see
+    src.visualization.raster.transfer), so the cost follows the canvas size instead of
+    the number of points; otherwise every crash is a marker. raster=None picks raster
+    mode from RASTER_MIN_POINTS points up.
+    """
+    if coords is None:
+        x = gdf_web.geometry.x.to_numpy()
+        y = gdf_web.geometry.y.to_numpy()
+    else:
+        x, y = coords
+        if selection is not None:
+            x, y = x[selection], y[selection]
+    if raster is None:
+        raster = len(x) >= RASTER_MIN_POINTS
 
+    fig, ax = plt.subplots(figsize=figsize)
     ax.set_frame_on(False)
     ax.get_xaxis().set_visible(False)
     ax.get_yaxis().set_visible(False)
     ax.set_title("Bike Crashes in Chapel Hill (2007–2018)", fontsize=14)
+
+    if not raster:
+        ax.scatter(x, y, s=5, alpha=0.5)
+        ax.set_aspect("equal")
+        add_basemap(ax, get_basemap_source(basemap_style, dark_mode=dark_mode))
+        plt.tight_layout()
+        return fig, ax
+
+    # same view the markers would get, then one count per pixel of the final layout
+    valid = ~(np.isnan(x) | np.isnan(y))
+    if valid.any():
+        ax.update_datalim(np.column_stack([x[valid], y[valid]]))
+        ax.autoscale_view()
+    ax.set_aspect("equal")
     plt.tight_layout()
+    extent = (*ax.get_xlim(), *ax.get_ylim())
+    counts = aggregate_points(x, y, extent, axes_pixel_shape(ax))
+    ax.imshow(shade(counts, how=how, cmap=cmap), extent=extent, origin="lower",
+              interpolation="nearest", zorder=2)
+    add_basemap(ax, get_basemap_source(basemap_style, dark_mode=dark_mode), zorder=0)
     return fig, ax
 
 
+def _severity_codes(injuries) -> tuple[np.ndarray, list]:
+    """Severity code per row (-1 = missing) and the labels; a categorical keeps its order."""
+    return value_codes(pd.Series(injuries))
+
+
+def _hex_counts(grid: HexGrid, gdf_web, coords, selection, injuries) -> tuple[np.ndarray, list]:
+    """
+    (hex x severity) count matrix on grid and the severity labels, either from a projected
+    GeoDataFrame or from precomputed coords (see src.utils.project_crash_coords) indexed
+    by a row selection. Rows without usable coordinates (NaN) are left out.
+    """
+    if coords is None:
+        x = gdf_web.geometry.x.to_numpy()
+        y = gdf_web.geometry.y.to_numpy()
+        codes, labels = _severity_codes(gdf_web["BikeInjury"])
+    else:
+        x, y = coords
+        if selection is not None:
+            x, y, injuries = x[selection], y[selection], injuries[selection]
+        codes, labels = _severity_codes(injuries)
+    return grid.count_matrix(grid.hex_ids(x, y), codes, len(labels)), labels
+
+
+def _set_hex_counts(collection, grid: HexGrid, totals: np.ndarray):
+    """
+    Show only the non-empty hexes (like hexbin's mincnt=1), colored by count. The
+    collection stays the same artist; only its offsets and color array change.
+    """
+    filled = np.flatnonzero(totals)
+    collection.set_offsets(grid.centers[filled])
+    collection.set_array(totals[filled])
+    if len(filled):
+        collection.set_clim(totals[filled].min(), totals[filled].max())
+
+
+def _tooltip_text(sev_counts: np.ndarray, labels: list) -> str:
+    # the matrix has one more column than labels (missing severity), zip leaves it out
+    return "Crash Severity Counts:\n" + "\n".join(
+        f"{label}: {n}" for label, n in zip(labels, sev_counts) if n
+    )
+
+
+def _make_annotation(ax):
+    annot = ax.annotate(
+        "",
+        xy=(0, 0),
+        xytext=(20, 20),
+        textcoords="offset points",
+        bbox=dict(boxstyle="round", fc="w"),
+        arrowprops=dict(arrowstyle="->"),
+        zorder=50,
+    )
+    annot.set_visible(False)
+    return annot
+
+
+def _update_hex_annot(annot, center, text, bounds):
+    """Update tooltip text/position for a hex at center."""
+    xmin, ymin, xmax, ymax = bounds
+    cx, cy = center
+    annot.xy = (cx, cy)
+
+    # Flip tooltip to avoid going off-screen horizontally
+    midpoint = (xmin + xmax) / 2
+    if cx > midpoint:
+        annot.set_ha("right")
+        annot.set_position((-20, 20))
+    else:
+        annot.set_ha("left")
+        annot.xytext = (20, 20)
+        annot.set_position((20, 20))
+
+    # Flip tooltip to avoid going off-screen vertically
+    midpoint_y = (ymin + ymax) / 2
+    if cy > midpoint_y:
+        annot.set_va("top")
+        annot.set_position((20, -20))
+    else:
+        annot.set_va("bottom")
+        annot.set_position((20, 20))
+
+    annot.set_text(text)
+
+
 def plot_crash_hexbin(
-    gdf_web: gpd.GeoDataFrame,
+    gdf_web: "gpd.GeoDataFrame" = None,
     basemap_style: str = "gray",
     gridsize: int = 40,
     ax=None,
     dark_mode: bool = False,
     dark_mode_updated: bool = False,
+    coords: tuple[np.ndarray, np.ndarray] = None,
+    selection: np.ndarray = None,
+    injuries: np.ndarray = None,
 ):
-    """Plot a hexbin density heatmap of crashes on an Esri basemap."""
-    import numpy as np
-    from scipy.spatial import cKDTree
-    from collections import Counter
-
+    """
+    Plot a hexbin density heatmap of crashes on an Esri basemap.
+
+    Either pass gdf_web (output of prepare_crash_geodata), or take the fast path with
+    coords=(x, y) from project_crash_coords, the matching BikeInjury values as injuries,
+    and selection = row positions to plot (None for all rows). The fast path never
+    builds geometries or reprojects.
+    """
     if ax is None:
         fig, ax = plt.subplots(figsize=(10, 10))
     else:
         fig = ax.figure
 
-    x = gdf_web.geometry.x
-    y = gdf_web.geometry.y
+    xmin, ymin, xmax, ymax = get_full_bounds()
+    grid = HexGrid((xmin, xmax, ymin, ymax), gridsize)
+    # one bincount gives the hex colors (row sums) and the tooltips (rows)
+    counts, labels = _hex_counts(grid, gdf_web, coords, selection, injuries)
+    totals = counts.sum(axis=1)
 
-    if gdf_web.empty or gdf_web.geometry.is_empty.all():
-        xmin, ymin, xmax, ymax = FULL_BOUNDS
+    if not totals.any():
+        xmin, ymin, xmax, ymax = get_full_bounds()
         ax.set_xlim(xmin, xmax)
         ax.set_ylim(ymin, ymax)
-        ctx.add_basemap(ax, source=_get_basemap_source(basemap_style, dark_mode=dark_mode))
+        add_basemap(ax, get_basemap_source(basemap_style, dark_mode=dark_mode))
 
         for t in list(ax.texts):
             t.remove()
 
         # apply dark mode styling if enabled
         # always reset colors to ensure proper switching between modes
+        text_color = '#ff6b6b' if dark_mode else "red"  # Lighter red for dark background
         if dark_mode_updated:
             if dark_mode:
                 fig.patch.set_facecolor("#959595")
                 ax.set_facecolor('#959595')
-                text_color = '#ff6b6b'  # Lighter red for dark background
             else:
                 # reset to light mode defaults
                 fig.patch.set_facecolor('white')
                 ax.set_facecolor('white')
-                text_color = "red"
 
         ax.text(
             0.5, 0.5, "No data for selected filters",
@@ -106,26 +236,18 @@ def plot_crash_hexbin(
         ax.get_yaxis().set_visible(False)
         return fig, ax
 
-    xmin, ymin, xmax, ymax = FULL_BOUNDS
-
     hexbin_cmap = cm.plasma
-    # Plot hexbin
-    hb = ax.hexbin(
-        x,
-        y,
-        gridsize=gridsize,
-        mincnt=1,
-        alpha=0.4,
-        extent=(xmin, xmax, ymin, ymax),
-        cmap=hexbin_cmap,
-    )
+    # Plot hexbin (same hexes as ax.hexbin(gridsize=gridsize, mincnt=1, extent=...))
+    hb = grid.collection(ax, cmap=hexbin_cmap, alpha=0.4)
+    _set_hex_counts(hb, grid, totals)
+    ax.add_collection(hb, autolim=False)
 
     ax.set_xlim(xmin, xmax)
     ax.set_ylim(ymin, ymax)
     ax.set_aspect("equal")
 
     # Add map background
-    ctx.add_basemap(ax, source=_get_basemap_source(basemap_style, dark_mode=dark_mode))
+    add_basemap(ax, get_basemap_source(basemap_style, dark_mode=dark_mode))
 
     # remove contextily text
     for t in list(ax.texts):
@@ -167,244 +289,516 @@ def plot_crash_hexbin(
 
     fig.subplots_adjust(left=0.005, right=0.995, top=1, bottom=0.1)
 
-    # Tooltip is slightly heuristic. Maps points to nearest hex centers.
-    centers = hb.get_offsets()
-    points = np.column_stack((x.to_numpy(), y.to_numpy()))
-    codes = gdf_web["BikeInjury"].to_numpy() 
+    annot = _make_annotation(ax)
+    tooltips = {}
+    shown = [-1]
 
-    tree = cKDTree(centers)
+    # the tooltip is its own blitted layer, so hovering never redraws the map
+    old = getattr(fig, "_hex_hover", None)
+    if old is not None:
+        # replotting on the same figure (e.g. after fig.clear()): drop the old handlers
+        old[0].disconnect()
+        fig.canvas.mpl_disconnect(old[1])
+    layers = LayeredCanvas(fig.canvas)
+    layers.add_layer("tooltip", [annot])
 
-    n_hex = centers.shape[0]
-    sev_per_hex = [Counter() for _ in range(n_hex)]
-    _, assigned_bins = tree.query(points)
+    def hover(event):
+        idx = -1
+        if event.inaxes is ax and event.xdata is not None:
+            # hex under the cursor, by grid arithmetic
+            idx = grid.hex_at(event.xdata, event.ydata)
+            if idx >= 0 and not totals[idx]:
+                idx = -1
+        if idx == shown[0]:
+            return
+        shown[0] = idx
 
-    for p_idx, bin_idx in enumerate(assigned_bins):
-        sev_per_hex[bin_idx][codes[p_idx]] += 1
+        if idx < 0:
+            annot.set_visible(False)
+        else:
+            if idx not in tooltips:
+                tooltips[idx] = _tooltip_text(counts[idx], labels)
+            _update_hex_annot(annot, grid.centers[idx], tooltips[idx], get_full_bounds())
+            annot.set_visible(True)
+        layers.invalidate("tooltip")
+        layers.update(top_key=idx if idx >= 0 else None)
 
-    annot = ax.annotate(
-        "",
-        xy=(0, 0),
-        xytext=(20, 20),
-        textcoords="offset points",
-        bbox=dict(boxstyle="round", fc="w"),
-        arrowprops=dict(arrowstyle="->"),
-        zorder=50,
-    )
-    annot.set_visible(False)
+    fig._hex_hover = (layers, fig.canvas.mpl_connect("motion_notify_event", hover))
+    return fig, ax
 
-    def update_hex_annot(i):
-        """Update tooltip text/position when hovering hex i."""
-        cx, cy = centers[i]
-        annot.xy = (cx, cy)
 
-        sev_counts = sev_per_hex[i]
+class CrashHeatmap:
+    """
+    Persistent interactive version of plot_crash_hexbin for a long-lived figure (the
+    dashboard). The axes, basemap, title and frame are built once and saved as the
+    static background of a LayeredCanvas; on top of it sit three layers:
+
+        "hex"       the hex collection (and the "no data" message)
+        "colorbar"  the colorbar axes, whose scale follows the data
+        "tooltip"   the hover annotation
+
+    set_data() counts the selection at every level of a HexPyramid (gridsize, 2x, 4x,
+    ... hexes across FULL_BOUNDS) from per-row hex ids computed once per dataset, so an
+    update is a take + bincount per level. The view shows the level matching the zoom
+    and only the hexes inside it, through one persistent PolyCollection (set_offsets /
+    set_array). Scroll zooms around the cursor, dragging pans, a double click resets
+    the view; none of it touches the raw points.
+
+    Hover finds the hex by grid arithmetic and only redraws the tooltip's pixels; theme
+    and view changes invalidate the background. Call draw() after changes; it redraws
+    just the invalidated layers and blits them.
+    """
+
+    HEX_LAYER, COLORBAR_LAYER, TOOLTIP_LAYER = "hex", "colorbar", "tooltip"
+    ZOOM_STEP = 1.25
+
+    def __init__(self, figure, basemap_style: str = "street", gridsize: int = 40,
+                 dark_mode: bool = False, n_levels: int = 5):
+        self.figure = figure
+        self.gridsize = gridsize
+        self.basemap_style = basemap_style
+        self.dark_mode = None
+        self.bounds = get_full_bounds()
+        xmin, ymin, xmax, ymax = self.bounds
+        self.pyramid = HexPyramid((xmin, xmax, ymin, ymax), gridsize, n_levels)
+        self.level = 0
+
+        self.ax = ax = figure.add_subplot(1, 1, 1)
+        ax.set_xlim(xmin, xmax)
+        ax.set_ylim(ymin, ymax)
+        ax.set_aspect("equal")
+        ax.set_frame_on(False)
+        ax.get_xaxis().set_visible(False)
+        ax.get_yaxis().set_visible(False)
+        self.title = ax.set_title("Bike Crash Density – Chapel Hill", fontsize=14)
+
+        self.hexes = self.grid.collection(ax, cmap=cm.plasma, alpha=0.4)
+        self.hexes.set_array(np.zeros(0))
+        self.hexes.set_clim(1, 2)
+        ax.add_collection(self.hexes, autolim=False)
+        self.colorbar = figure.colorbar(self.hexes, ax=ax, orientation="horizontal",
+                                        label="Crash Count", pad=0.05, shrink=0.95)
+        figure.subplots_adjust(left=0.005, right=0.995, top=1, bottom=0.1)
+
+        self.no_data_text = ax.text(0.5, 0.5, "No data for selected filters", ha="center",
+                                    va="center", fontsize=12, color="red", transform=ax.transAxes)
+        self.no_data_text.set_visible(False)
+        self.annot = _make_annotation(ax)
+
+        # per level: (sorted non-empty hex ids, their (hex x severity) counts, row sums)
+        empty = (np.zeros(0, dtype=np.int64), np.zeros((0, 1), dtype=np.int64), np.zeros(0, dtype=np.int64))
+        self.level_counts = [empty] * len(self.pyramid)
+        self.labels = []
+        # tooltip text per hex of the shown level, built on first hover
+        self._tooltips = {}
+        self._hover_hex = -1
+        # (x array, injuries, hex ids per row per level, severity code per row, labels) of the last dataset
+        self._rows = None
+        self._rows_lock = threading.Lock()
+        # (press x, press y, xlim, ylim, inverted transData) while dragging
+        self._drag = None
+
+        self.layers = LayeredCanvas(figure.canvas)
+        self.layers.add_layer(self.HEX_LAYER, [self.hexes, self.no_data_text])
+        self.layers.add_layer(self.COLORBAR_LAYER, [self.colorbar.ax])
+        self.layers.add_layer(self.TOOLTIP_LAYER, [self.annot])
+
+        self.set_dark_mode(dark_mode)
+        canvas = figure.canvas
+        self._cids = [
+            canvas.mpl_connect("motion_notify_event", self._on_motion),
+            canvas.mpl_connect("scroll_event", self._on_scroll),
+            canvas.mpl_connect("button_press_event", self._on_press),
+            canvas.mpl_connect("button_release_event", self._on_release),
+        ]
+
+    @property
+    def grid(self) -> HexGrid:
+        """Grid of the level on screen."""
+        return self.pyramid.grids[self.level]
+
+    def set_dark_mode(self, dark_mode: bool):
+        """Restyle for dark/light mode; a no-op if the mode didn't change."""
+        if dark_mode == self.dark_mode:
+            return
+        self.dark_mode = dark_mode
+        color = "white" if dark_mode else "black"
+        face = "#1a1a1a" if dark_mode else "white"
+        self.figure.patch.set_facecolor(face)
+        self.ax.set_facecolor(face)
+        self.title.set_color(color)
+        self.colorbar.set_label("Crash Count", color=color)
+        self.colorbar.ax.xaxis.set_tick_params(color=color, labelcolor=color)
+        self.no_data_text.set_color("#ff6b6b" if dark_mode else "red")  # Lighter red for dark background
+
+        self._add_basemap()
+        for layer in (LayeredCanvas.BACKGROUND, self.HEX_LAYER, self.COLORBAR_LAYER):
+            self.layers.invalidate(layer)
+
+    def _add_basemap(self):
+        # the basemap source may depend on the mode (see get_basemap_source); the
+        # extent is the current view, so zooming in fetches finer tiles
+        add_basemap(self.ax, get_basemap_source(self.basemap_style, dark_mode=self.dark_mode))
+
+    def _row_codes(self, coords, injuries) -> tuple[list[np.ndarray], np.ndarray, list]:
+        """Hex ids (per level) and severity code of every row, reused while the same arrays are passed in."""
+        with self._rows_lock:
+            rows = self._rows
+            if rows is None or rows[0] is not coords[0] or rows[1] is not injuries:
+                codes, labels = _severity_codes(injuries)
+                # holding on to the arrays also keeps the identity check above sound
+                rows = (coords[0], injuries, self.pyramid.hex_ids(*coords), codes, labels)
+                self._rows = rows
+            return rows[2], rows[3], rows[4]
+
+    def count_levels(self, coords: tuple[np.ndarray, np.ndarray] = None, selection: np.ndarray = None,
+                     injuries: np.ndarray = None, gdf_web: "gpd.GeoDataFrame" = None) -> tuple[list, list]:
+        """
+        The counting half of set_data: (per level (filled hex ids, hex x severity counts,
+        row sums), severity labels). Touches no artists, so it can run off the GUI thread;
+        hand the result to set_counts.
+        """
+        if coords is None:
+            x = gdf_web.geometry.x.to_numpy()
+            y = gdf_web.geometry.y.to_numpy()
+            level_ids = self.pyramid.hex_ids(x, y)
+            codes, labels = _severity_codes(gdf_web["BikeInjury"])
+        else:
+            level_ids, codes, labels = self._row_codes(coords, injuries)
+            if selection is not None:
+                level_ids = [ids[selection] for ids in level_ids]
+                codes = codes[selection]
+
+        level_counts = []
+        for grid, ids in zip(self.pyramid.grids, level_ids):
+            filled, counts = grid.sparse_counts(ids, codes, len(labels))
+            level_counts.append((filled, counts, counts.sum(axis=1)))
+        return level_counts, labels
+
+    def set_counts(self, level_counts: list, labels: list):
+        """Show counts from count_levels."""
+        self.level_counts = level_counts
+        self.labels = labels
+        self._show_level()
+
+    def set_data(self, coords: tuple[np.ndarray, np.ndarray] = None, selection: np.ndarray = None,
+                 injuries: np.ndarray = None, gdf_web: "gpd.GeoDataFrame" = None):
+        """Recount the crashes to show (same arguments as plot_crash_hexbin)."""
+        self.set_counts(*self.count_levels(coords, selection, injuries, gdf_web))
+
+    def _show_level(self):
+        """Put the non-empty hexes of the current level that are inside the view on screen."""
+        filled, _, totals = self.level_counts[self.level]
+        has_data = len(filled) > 0
+
+        # cull to the view, with a hex of slack so edge hexes aren't cut off
+        centers = self.grid.hex_centers(filled)
+        (x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+        pad_x, pad_y = self.grid.sx, self.grid.sy
+        inside = ((centers[:, 0] >= x0 - pad_x) & (centers[:, 0] <= x1 + pad_x)
+                  & (centers[:, 1] >= y0 - pad_y) & (centers[:, 1] <= y1 + pad_y))
+
+        self.hexes.set_paths([self.grid.polygon])
+        self.hexes.set_offsets(centers[inside])
+        self.hexes.set_array(totals[inside])
+        if has_data:
+            # scale over the whole level, so colors don't shift while panning
+            self.hexes.set_clim(totals.min(), totals.max())
+        self.hexes.set_visible(has_data)
+        self.no_data_text.set_visible(not has_data)
+        self.annot.set_visible(False)
+        self._tooltips = {}
+        self._hover_hex = -1
+        self.layers.invalidate(self.HEX_LAYER)
+        self.layers.invalidate(self.COLORBAR_LAYER)
+
+    def set_view(self, xlim: tuple, ylim: tuple, refresh_basemap: bool = True):
+        """
+        Show xlim x ylim (clamped to FULL_BOUNDS) at the matching pyramid level. Without
+        refresh_basemap the current basemap raster is kept, e.g. in the middle of a drag.
+        """
+        xmin, ymin, xmax, ymax = self.bounds
+        width = min(xlim[1] - xlim[0], xmax - xmin)
+        height = min(ylim[1] - ylim[0], ymax - ymin)
+        x0 = min(max(xlim[0], xmin), xmax - width)
+        y0 = min(max(ylim[0], ymin), ymax - height)
+        self.ax.set_xlim(x0, x0 + width)
+        self.ax.set_ylim(y0, y0 + height)
+
+        self.level = self.pyramid.level_for(width)
+        self._show_level()
+        if refresh_basemap:
+            self._add_basemap()
+        self.layers.invalidate(LayeredCanvas.BACKGROUND)
+
+    def reset_view(self):
+        xmin, ymin, xmax, ymax = self.bounds
+        self.set_view((xmin, xmax), (ymin, ymax))
+
+    def zoom(self, factor: float, center: tuple | None = None):
+        """Zoom in (factor > 1) or out around center (default: the view's center)."""
+        (x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+        cx, cy = center if center is not None else ((x0 + x1) / 2, (y0 + y1) / 2)
+        self.set_view((cx - (cx - x0) / factor, cx + (x1 - cx) / factor),
+                      (cy - (cy - y0) / factor, cy + (y1 - cy) / factor))
+
+    def invalidate(self, layer: str | None = None):
+        """Mark one layer (or with None, everything) for redrawing on the next draw()."""
+        self.layers.invalidate(layer)
+
+    def draw(self):
+        self.layers.update()
+
+    def tooltip(self, hex_id: int) -> str:
+        """Tooltip text of one hex of the shown level, formatted once per data/level update."""
+        text = self._tooltips.get(hex_id)
+        if text is None:
+            filled, counts, _ = self.level_counts[self.level]
+            row = np.searchsorted(filled, hex_id)
+            text = self._tooltips[hex_id] = _tooltip_text(counts[row], self.labels)
+        return text
+
+    def hex_at(self, event) -> int:
+        """Non-empty hex (of the shown level) under a mouse event, or -1."""
+        if event.inaxes is not self.ax or event.xdata is None:
+            return -1
+        idx = self.grid.hex_at(event.xdata, event.ydata)
+        filled = self.level_counts[self.level][0]
+        row = np.searchsorted(filled, idx)
+        return idx if idx >= 0 and row < len(filled) and filled[row] == idx else -1
+
+    def _on_motion(self, event):
+        if self._drag is not None:
+            self._on_drag(event)
+            return
 
-        if not sev_counts:
-            annot.set_visible(False)
+        idx = self.hex_at(event)
+        # moving within the same hex changes nothing
+        if idx == self._hover_hex:
             return
+        self._hover_hex = idx
 
-        # Flip tooltip to avoid going off-screen horizontally
-        midpoint = (xmin + xmax) / 2
-        if cx > midpoint:
-            annot.set_ha("right")
-            annot.set_position((-20, 20))
-        else:
-            annot.set_ha("left")
-            annot.xytext = (20, 20)
-            annot.set_position((20, 20))
-
-        # Flip tooltip to avoid going off-screen vertically
-        midpoint_y = (ymin + ymax) / 2
-        if cy > midpoint_y:
-            annot.set_va("top")
-            annot.set_position((20, -20))
+        if idx < 0:
+            self.annot.set_visible(False)
         else:
-            annot.set_va("bottom")
-            annot.set_position((20, 20))
-
-        text = "Crash Severity Counts:\n" + "\n".join(
-            f"{k}: {v}" for k, v in sev_counts.items()
-        )
-        annot.set_text(text)
+            center = self.grid.hex_centers([idx])[0]
+            (x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+            _update_hex_annot(self.annot, center, self.tooltip(idx), (x0, y0, x1, y1))
+            self.annot.set_visible(True)
+        # only the tooltip's pixels are restored and blitted (and reused on the next
+        # visit to this hex), see LayeredCanvas
+        self.layers.invalidate(self.TOOLTIP_LAYER)
+        self.layers.update(top_key=(self.level, idx) if idx >= 0 else None)
+
+    def _on_scroll(self, event):
+        if event.inaxes is not self.ax:
+            return
+        factor = self.ZOOM_STEP if event.button == "up" else 1 / self.ZOOM_STEP
+        self.zoom(factor, (event.xdata, event.ydata))
+        self.draw()
 
-    def hover(event):
-        if not event.inaxes:
-            if annot.get_visible():
-                annot.set_visible(False)
-                fig.canvas.draw_idle()
+    def _on_press(self, event):
+        if event.inaxes is not self.ax or event.button != 1:
             return
+        if event.dblclick:
+            self.reset_view()
+            self.draw()
+            return
+        self._drag = (event.x, event.y, self.ax.get_xlim(), self.ax.get_ylim(),
+                      self.ax.transData.inverted())
+
+    def _on_drag(self, event):
+        x, y, xlim, ylim, inverse = self._drag
+        # pixel offset since the press, in data units of the view at the press
+        (dx0, dy0), (dx1, dy1) = inverse.transform([(x, y), (event.x, event.y)])
+        dx, dy = dx1 - dx0, dy1 - dy0
+        self.set_view((xlim[0] - dx, xlim[1] - dx), (ylim[0] - dy, ylim[1] - dy), refresh_basemap=False)
+        # let the GUI coalesce redraws while the mouse moves
+        self.layers.update(idle=True)
+
+    def _on_release(self, event):
+        if self._drag is None:
+            return
+        self._drag = None
+        self._add_basemap()
+        self.layers.invalidate(LayeredCanvas.BACKGROUND)
+        self.draw()
 
-        # Nearest hex to cursor
-        dist, idx = tree.query([event.xdata, event.ydata])
-        hex_size = (xmax - xmin) / gridsize
 
-        if dist < hex_size:
-            update_hex_annot(idx)
-            annot.set_visible(True)
-            fig.canvas.draw_idle()
-        else:
-            if annot.get_visible():
-                annot.set_visible(False)
-                fig.canvas.draw_idle()
+class DensityFrames:
+    """
+    Hex counts per animation frame (a year or a month) on one fixed grid, see
+    crash_density_frames. Only hexes that are filled in some frame are kept, in a
+    (hex x frame) matrix, so the object is small and cheap to pickle into export workers.
+    """
 
-    fig.canvas.mpl_connect("motion_notify_event", hover)
-    return fig, ax
+    def __init__(self, extent, gridsize: int, labels: list[str], counts: np.ndarray):
+        self.extent = tuple(float(v) for v in extent)   # (xmin, xmax, ymin, ymax)
+        self.gridsize = gridsize
+        self.labels = labels
+        self.hex_ids = np.flatnonzero(counts.any(axis=1))
+        self.counts = counts[self.hex_ids]
+        self.crashes = counts.sum(axis=0)
 
+    def __len__(self):
+        return len(self.labels)
 
-def animate_crash_density_over_time(
+    @property
+    def grid(self) -> HexGrid:
+        return HexGrid(self.extent, self.gridsize)
+
+    @property
+    def vmax(self) -> int:
+        return max(int(self.counts.max(initial=0)), 2)
+
+    def frame_array(self, frame: int) -> np.ma.MaskedArray:
+        """Colors of frame; empty hexes are masked, so they are not drawn."""
+        return np.ma.masked_equal(self.counts[:, frame], 0)
+
+    def title(self, frame: int) -> str:
+        return f"Bike Crash Density - {self.labels[frame]}\n({self.crashes[frame]} crashes)"
+
+
+def crash_density_frames(
     df: pd.DataFrame = None,
-    basemap_style: str = "gray",
     gridsize: int = 40,
+    period: str = "year",
     year_col: str = "CrashYear",
-    interval: int = 1000,
-    figsize=(10, 10),
-    save_path: str = None,
-):
-
-    df = load_bike_crash_data()
-    df = df[df[year_col].notna()].copy()
-    
-    years = sorted(df[year_col].unique())
-    years = [int(y) for y in years if pd.notna(y)]
-
-    # prepare GeoDataFrame for all data to get consistent bounds
-    gdf_all = prepare_crash_geodata(df)
-    xmin, ymin, xmax, ymax = gdf_all.total_bounds
-    
-    fig, ax = plt.subplots(figsize=figsize)
+    month_col: str = "CrashMonth",
+) -> DensityFrames:
+    """
+    Per-year (period="year") or per-month (period="month") hex counts of df in one
+    grouped pass: a frame code per row, then a single bincount over (hex, frame) pairs.
+    Monthly frames run from the first to the last month with crashes, empty months
+    included, so the timeline is even. df=None uses the shared dataset and its
+    projected coordinates; otherwise df is projected here.
+    """
+    if period not in ("year", "month"):
+        raise ValueError(f"period must be 'year' or 'month', not {period!r}")
+    if df is None:
+        registry = get_registry()
+        df = registry.data()
+        x, y = registry.coords()
+    else:
+        x, y = project_crash_coords(df)
+
+    year_values = pd.to_numeric(df[year_col], errors="coerce").to_numpy(dtype=float)
+    keep = ~(np.isnan(x) | np.isnan(y) | np.isnan(year_values))
+    if period == "month":
+        month_codes = pd.Categorical(df[month_col], categories=MONTH_ORDER).codes
+        keep &= month_codes >= 0
+    if not keep.any():
+        raise ValueError("no crashes with coordinates and a date to animate")
+
+    # fixed extent from every mappable crash, like the other maps
+    xmin, ymin, xmax, ymax = coords_bounds(x[keep], y[keep])
+    grid = HexGrid((xmin, xmax, ymin, ymax), gridsize)
+    years = np.unique(year_values[keep]).astype(int)
+    if period == "year":
+        codes = np.searchsorted(years, year_values[keep])
+        labels = [f"Year {year}" for year in years]
+    else:
+        # months since January of the first year, so years without crashes keep their
+        # (empty) months on the timeline
+        codes = (year_values[keep].astype(int) - years[0]) * 12 + month_codes[keep]
+        first = codes.min()
+        codes = codes - first
+        labels = [f"{MONTH_ORDER[code % 12]} {years[0] + code // 12}"
+                  for code in range(first, first + codes.max() + 1)]
+
+    counts = grid.count_matrix(grid.hex_ids(x[keep], y[keep]), codes, len(labels))
+    return DensityFrames((xmin, xmax, ymin, ymax), gridsize, labels, counts[:, :len(labels)])
+
+
+def draw_density_frame(fig, frames: DensityFrames, basemap_style: str = "gray"):
+    """
+    Lay out the static part of a density animation on an empty figure (basemap, hex
+    collection with one normalization for all frames, colorbar, title box) and return
+    update(frame), which only swaps the hex colors and the title text and returns the
+    changed artists.
+    """
+    xmin, xmax, ymin, ymax = frames.extent
+    ax = fig.add_subplot()
     ax.set_xlim(xmin, xmax)
     ax.set_ylim(ymin, ymax)
     ax.set_aspect("equal")
     ax.set_frame_on(False)
     ax.get_xaxis().set_visible(False)
     ax.get_yaxis().set_visible(False)
-    
-    # store data by year
-    gdf_by_year = {}
-    for year in years:
-        df_year = df[df[year_col] == year].copy()
-        if len(df_year) > 0:
-            gdf_year = prepare_crash_geodata(df_year)
-            gdf_by_year[year] = gdf_year
-            print(f"Year {year}: {len(gdf_year)} crashes with valid coordinates")
-        else:
-            gdf_by_year[year] = gpd.GeoDataFrame(geometry=[], crs="EPSG:3857")
-            print(f"Year {year}: 0 crashes")
-    
-    # initialize empty hexbin and colorbar
-    hb = None
-    cb = None
-    
-    basemap_source = _get_basemap_source(basemap_style)
-    
-    def animate(frame):
-        """Update function for animation"""
-        nonlocal hb, cb
-        
-        year = years[frame]
-        
-        if cb is not None:
-            try:
-                cb.remove()
-            except (AttributeError, ValueError):
-                pass  # colorbar already removed or doesn't exist
-        
-        ax.clear()
-        ax.set_xlim(xmin, xmax)
-        ax.set_ylim(ymin, ymax)
-        ax.set_aspect("equal")
-        ax.set_frame_on(False)
-        ax.get_xaxis().set_visible(False)
-        ax.get_yaxis().set_visible(False)
-        
-        # add basemap
-        ctx.add_basemap(ax, source=basemap_source, crs="EPSG:3857", zorder=0)
-        
-        # remove contextily text
-        for t in list(ax.texts):
-            if t.get_text() == "" or "contextily" in str(t).lower():
-                t.remove()
-        
-        # data for this year
-        gdf_year = gdf_by_year[year]
-        
-        title_text = ax.text(
-            0.5, 0.95,
-            f"Bike Crash Density - Year {year}\n({len(gdf_year)} crashes)",
-            transform=ax.transAxes,
-            ha="center",
-            fontsize=16,
-            weight="bold",
-            bbox=dict(boxstyle="round,pad=0.5", facecolor="white", alpha=0.8),
-            zorder=100
-        )
-        
-        # plot hexbin for this year
-        if not gdf_year.empty and not gdf_year.geometry.is_empty.all():
-            x = gdf_year.geometry.x
-            y = gdf_year.geometry.y
-            
-            hb = ax.hexbin(
-                x,
-                y,
-                gridsize=gridsize,
-                mincnt=1,
-                alpha=0.6,
-                extent=(xmin, xmax, ymin, ymax),
-                cmap="YlOrRd",  # Yellow-Orange-Red colormap
-                zorder=10
-            )
-            
-            # add colorbar
-            cb = fig.colorbar(
-                hb,
-                ax=ax,
-                orientation="horizontal",
-                label="Crash Count",
-                pad=0.05,
-                shrink=0.95
-            )
-        else:
-            # no data for this year - create empty hexbin to maintain structure
-            hb = ax.hexbin(
-                [],
-                [],
-                gridsize=gridsize,
-                mincnt=1,
-                alpha=0.6,
-                extent=(xmin, xmax, ymin, ymax),
-                cmap="YlOrRd",
-                zorder=10
-            )
-            cb = fig.colorbar(
-                hb,
-                ax=ax,
-                orientation="horizontal",
-                label="Crash Count",
-                pad=0.05,
-                shrink=0.95
-            )
-        
-        fig.subplots_adjust(left=0.005, right=0.995, top=0.95, bottom=0.1)
-        fig.canvas.draw_idle()
-        
+    add_basemap(ax, get_basemap_source(basemap_style), zorder=0)
+
+    grid = frames.grid
+    hb = grid.collection(ax, cmap="YlOrRd", norm=Normalize(vmin=1, vmax=frames.vmax),  # Yellow-Orange-Red colormap
+                         alpha=0.6, zorder=10)
+    hb.set_offsets(grid.hex_centers(frames.hex_ids))
+    hb.set_array(frames.frame_array(0))
+    ax.add_collection(hb, autolim=False)
+    fig.colorbar(hb, ax=ax, orientation="horizontal", label="Crash Count", pad=0.05, shrink=0.95)
+
+    title_text = ax.text(
+        0.5, 0.95, frames.title(0),
+        transform=ax.transAxes,
+        ha="center",
+        fontsize=16,
+        weight="bold",
+        bbox=dict(boxstyle="round,pad=0.5", facecolor="white", alpha=0.8),
+        zorder=100
+    )
+    fig.subplots_adjust(left=0.005, right=0.995, top=0.95, bottom=0.1)
+
+    def update(frame):
+        hb.set_array(frames.frame_array(frame))
+        title_text.set_text(frames.title(frame))
         return hb, title_text
-    
-    animate(0)
-    
+
+    return update
+
+
+def animate_crash_density_over_time(
+    df: pd.DataFrame = None,
+    basemap_style: str = "gray",
+    gridsize: int = 40,
+    year_col: str = "CrashYear",
+    interval: int = 1000,
+    figsize=(10, 10),
+    save_path: str = None,
+    period: str = "year",
+):
+    """
+    Animate the yearly (or, with period="month", monthly) hex density of crashes on a
+    fixed map.
+
+    All frame counts come from one grouped bincount up front (crash_density_frames) and
+    share one color normalization, so frames are comparable. Each frame only swaps the
+    color array of a persistent hex collection and the title text over a basemap drawn
+    once. save_path exports through src.visualization.export, rendering frames in
+    parallel.
+    """
+    frames = crash_density_frames(df, gridsize, period=period, year_col=year_col)
+    for label, n in zip(frames.labels, frames.crashes):
+        print(f"{label}: {n} crashes with valid coordinates")
+
+    fig = plt.figure(figsize=figsize)
+    update = draw_density_frame(fig, frames, basemap_style)
+
+    # only the hexes and the title change, so interactive playback blits them over the
+    # cached background
     anim = FuncAnimation(
         fig,
-        animate,
-        frames=len(years),
+        update,
+        frames=len(frames),
         interval=interval,
         repeat=True,
-        blit=False  # blit=False because we're removing/adding elements
+        blit=True,
     )
-    
+
     # save animation if path flagged
     if save_path:
+        from src.visualization.export import export_density_animation
+
         print(f"Saving animation to {save_path}...")
-        anim.save(save_path, writer="pillow", fps=1)
+        export_density_animation(frames, save_path, basemap_style=basemap_style, figsize=figsize,
+                                 fps=1000 / interval)
         print("Animation saved!")
-    
+
     return fig, anim
@@ -0,0 +1,164 @@
+# hexagonal binning on a fixed grid, the same arithmetic as matplotlib's Axes.hexbin
+import math
+from functools import cached_property
+
+import numpy as np
+from matplotlib import transforms
+from matplotlib.collections import PolyCollection
+
+
+class HexGrid:
+    """
+    The hexagon grid ax.hexbin(x, y, gridsize=gridsize, extent=extent) uses, fixed once.
+
+    Hexes are numbered like hexbin numbers them: first the (nx + 1) x (ny + 1) hexes of
+    the "round" lattice, then the nx x ny hexes of the lattice offset by half a cell.
+    hex_ids() assigns points arithmetically (no tree, no Python loop), so binning is
+    O(n) and a (hex, severity) count matrix is one np.bincount. Because the grid never
+    moves, per-row hex ids can be computed once and reused for every filter state.
+    """
+
+    def __init__(self, extent, gridsize: int = 40):
+        xmin, xmax, ymin, ymax = extent
+        self.gridsize = gridsize
+        self.extent = (xmin, xmax, ymin, ymax)
+        self.nx = gridsize
+        self.ny = int(gridsize / math.sqrt(3))
+        self.n_round = (self.nx + 1) * (self.ny + 1)
+        self.n_hex = self.n_round + self.nx * self.ny
+
+        # hexbin pads the x range against roundoff
+        padding = 1.e-9 * (xmax - xmin)
+        self.xmin = xmin - padding
+        self.ymin = ymin
+        self.sx = (xmax + padding - self.xmin) / self.nx
+        self.sy = (ymax - ymin) / self.ny
+
+        self.polygon = [self.sx, self.sy / 3] * np.array(
+            [[.5, -.5], [.5, .5], [0., 1.], [-.5, .5], [-.5, -.5], [0., -1.]])
+
+    @cached_property
+    def centers(self) -> np.ndarray:
+        """(n_hex, 2) center of every hex; fine grids should use hex_centers(ids) instead."""
+        return self.hex_centers(np.arange(self.n_hex))
+
+    def hex_centers(self, ids: np.ndarray) -> np.ndarray:
+        """(len(ids), 2) centers of the given hexes, computed from the ids."""
+        ids = np.asarray(ids, dtype=np.int64)
+        offset = ids >= self.n_round
+        round_ix, round_iy = np.divmod(ids, self.ny + 1)
+        shift_ix, shift_iy = np.divmod(ids - self.n_round, max(self.ny, 1))
+        centers = np.empty((len(ids), 2))
+        centers[:, 0] = np.where(offset, shift_ix + 0.5, round_ix) * self.sx + self.xmin
+        centers[:, 1] = np.where(offset, shift_iy + 0.5, round_iy) * self.sy + self.ymin
+        return centers
+
+    def hex_ids(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Hex id per point, -1 for points outside the grid or with NaN coordinates."""
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        ix = np.where(valid, (x - self.xmin) / self.sx, -10.0)
+        iy = np.where(valid, (y - self.ymin) / self.sy, -10.0)
+
+        # nearest center of each lattice, then the closer of the two (hex distance)
+        ix1, iy1 = np.round(ix).astype(np.int64), np.round(iy).astype(np.int64)
+        ix2, iy2 = np.floor(ix).astype(np.int64), np.floor(iy).astype(np.int64)
+        d1 = (ix - ix1) ** 2 + 3.0 * (iy - iy1) ** 2
+        d2 = (ix - ix2 - 0.5) ** 2 + 3.0 * (iy - iy2 - 0.5) ** 2
+
+        ny1 = self.ny + 1
+        id1 = np.where((0 <= ix1) & (ix1 <= self.nx) & (0 <= iy1) & (iy1 < ny1), ix1 * ny1 + iy1, -1)
+        id2 = np.where((0 <= ix2) & (ix2 < self.nx) & (0 <= iy2) & (iy2 < self.ny),
+                       self.n_round + ix2 * self.ny + iy2, -1)
+        ids = np.where(d1 < d2, id1, id2)
+        ids[~valid] = -1
+        return ids
+
+    def hex_at(self, x: float, y: float) -> int:
+        """hex_ids() for a single point in plain float arithmetic (O(1), e.g. per mouse move)."""
+        if math.isnan(x) or math.isnan(y):
+            return -1
+        ix = (x - self.xmin) / self.sx
+        iy = (y - self.ymin) / self.sy
+        # round half to even, like np.round
+        ix1, iy1 = round(ix), round(iy)
+        ix2, iy2 = math.floor(ix), math.floor(iy)
+        if (ix - ix1) ** 2 + 3.0 * (iy - iy1) ** 2 < (ix - ix2 - 0.5) ** 2 + 3.0 * (iy - iy2 - 0.5) ** 2:
+            if 0 <= ix1 <= self.nx and 0 <= iy1 <= self.ny:
+                return ix1 * (self.ny + 1) + iy1
+            return -1
+        if 0 <= ix2 < self.nx and 0 <= iy2 < self.ny:
+            return self.n_round + ix2 * self.ny + iy2
+        return -1
+
+    def count_matrix(self, hex_ids: np.ndarray, codes: np.ndarray, n_codes: int) -> np.ndarray:
+        """
+        Counts per (hex, code) in one bincount, shape (n_hex, n_codes + 1). codes are
+        0..n_codes-1 (e.g. severity codes) or -1 for missing, which lands in the last
+        column; points without a hex (-1) are dropped. Row sums are the hexbin counts.
+        """
+        codes = np.where(codes < 0, n_codes, codes)
+        keep = hex_ids >= 0
+        flat = hex_ids[keep] * (n_codes + 1) + codes[keep]
+        counts = np.bincount(flat, minlength=self.n_hex * (n_codes + 1))
+        return counts.reshape(self.n_hex, n_codes + 1)
+
+    def sparse_counts(self, hex_ids: np.ndarray, codes: np.ndarray, n_codes: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        count_matrix() restricted to the non-empty hexes: (sorted hex ids, counts of shape
+        (len(ids), n_codes + 1)). Costs O(points + n_hex) instead of O(n_hex * n_codes)
+        memory, which matters on fine grids.
+        """
+        keep = hex_ids >= 0
+        hex_ids = hex_ids[keep]
+        filled = np.flatnonzero(np.bincount(hex_ids, minlength=self.n_hex))
+        compact = np.zeros(self.n_hex, dtype=np.int64)
+        compact[filled] = np.arange(len(filled))
+        codes = np.where(codes[keep] < 0, n_codes, codes[keep])
+        flat = compact[hex_ids] * (n_codes + 1) + codes
+        counts = np.bincount(flat, minlength=len(filled) * (n_codes + 1))
+        return filled, counts.reshape(len(filled), n_codes + 1)
+
+    def collection(self, ax, **kwargs) -> PolyCollection:
+        """
+        Empty PolyCollection of the grid's hexagon (the same geometry ax.hexbin draws),
+        not yet added to ax. Place hexes with set_offsets(hex_centers(ids)) and color
+        them with set_array.
+        """
+        kwargs.setdefault("edgecolors", "face")
+        return PolyCollection([self.polygon], offsets=np.zeros((0, 2)),
+                              offset_transform=transforms.AffineDeltaTransform(ax.transData),
+                              **kwargs)
+
+
+class HexPyramid:
+    """
+    HexGrids over one extent at several resolutions, gridsize doubling per level
+    (40, 80, 160, ... hexes across). Per-row hex ids are computed once per level, so
+    counting a selection at every level is a take + bincount per level, and panning or
+    zooming only switches between precomputed aggregates. level_for() picks the level
+    that keeps about base_gridsize hexes across the visible width.
+    """
+
+    def __init__(self, extent, base_gridsize: int = 40, n_levels: int = 5):
+        self.extent = tuple(extent)
+        self.base_gridsize = base_gridsize
+        self.grids = [HexGrid(extent, base_gridsize * 2 ** i) for i in range(n_levels)]
+
+    def __len__(self):
+        return len(self.grids)
+
+    def level_for(self, view_width: float) -> int:
+        """Coarsest level with at least base_gridsize hexes across view_width."""
+        xmin, xmax = self.extent[:2]
+        needed = self.base_gridsize * (xmax - xmin) / max(view_width, 1e-9)
+        for level, grid in enumerate(self.grids):
+            # a little slack so the full view stays on level 0
+            if grid.gridsize >= needed * 0.999:
+                return level
+        return len(self.grids) - 1
+
+    def hex_ids(self, x: np.ndarray, y: np.ndarray) -> list[np.ndarray]:
+        """Hex id per point at every level (int32, -1 = outside / NaN)."""
+        return [grid.hex_ids(x, y).astype(np.int32) for grid in self.grids]
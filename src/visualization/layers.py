@@ -0,0 +1,204 @@
+# blit-based layered rendering: static background saved once, dynamic layers redrawn on top
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from matplotlib.transforms import Bbox
+
+
+class LayeredCanvas:
+    """
+    Renders a figure as a static background plus an ordered stack of dynamic layers.
+
+    Every artist of a dynamic layer is marked animated, so a full draw only renders the
+    background (basemap, frame, title, ...). Right after a full draw the background is
+    saved with copy_from_bbox, then each layer is drawn on top and the canvas is saved
+    again after every layer. Invalidating a layer therefore restores the snapshot just
+    below it and redraws only that layer and the ones above it, followed by one blit:
+
+        layers = LayeredCanvas(fig.canvas)
+        layers.add_layer("hex", [collection])
+        layers.add_layer("tooltip", [annotation])
+        ...
+        collection.set_array(counts)
+        layers.invalidate("hex")
+        layers.update()
+
+    invalidate() without a layer name (or with "background") forces a full draw, e.g.
+    after the basemap, the axis limits or the theme changed. Resizes trigger a full draw
+    on their own and the snapshots are retaken.
+
+    The top layer is meant for small, fast-changing artists (a hover tooltip): when it
+    is the only dirty layer, just the pixels under its old and new window extents are
+    restored, redrawn and blitted, so the cost follows the tooltip's size, not the canvas'.
+    update(top_key=...) additionally keeps the top layer's rendered pixels per key (e.g.
+    per hovered hex) until a lower layer changes, so revisiting a key is a plain paste.
+    """
+
+    # slack around the top layer's window extents (inches), for text boxes and arrows
+    TOP_LAYER_PAD = 0.1
+    MAX_TOP_CACHE = 128
+
+    BACKGROUND = "background"
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self._layers = {}           # name -> artists, in drawing order
+        self._snapshots = []        # region after the background and after each layer
+        self._dirty = None          # index of the lowest layer to redraw, None = clean
+        self._background_dirty = True
+        self._flattened = False
+        self._size = None           # figure size in pixels when the snapshots were taken
+        self._top_extent = None     # display bbox the top layer covered when last drawn
+        self._top_cache = OrderedDict()     # top_key -> (extent, pixels) of the top layer
+        self._cid = canvas.mpl_connect("draw_event", self._on_draw)
+
+    @property
+    def layer_names(self) -> list[str]:
+        return list(self._layers)
+
+    def add_layer(self, name: str, artists=()):
+        """Append a layer (drawn above the existing ones); artists can be added later."""
+        self._layers[name] = []
+        self.add_artists(name, artists)
+
+    def add_artists(self, name: str, artists):
+        for artist in artists:
+            artist.set_animated(True)
+            self._layers[name].append(artist)
+        self.invalidate(name)
+
+    def remove_artists(self, name: str):
+        """Remove the layer's artists from the figure and forget them."""
+        for artist in self._layers[name]:
+            if artist.axes is not None or artist.figure is not None:
+                artist.remove()
+        self._layers[name] = []
+        self.invalidate(name)
+
+    def set_artists(self, name: str, artists):
+        """Replace the layer's artists (the old ones are removed from the figure)."""
+        self.remove_artists(name)
+        self.add_artists(name, artists)
+
+    def invalidate(self, name: str | None = None):
+        if name is None or name == self.BACKGROUND:
+            self._background_dirty = True
+            return
+        index = list(self._layers).index(name)
+        self._dirty = index if self._dirty is None else min(self._dirty, index)
+
+    def update(self, top_key=None, idle: bool = False):
+        """
+        Bring the canvas up to date with as little drawing as possible. top_key names the
+        current content of the top layer (None: don't cache it), see the class docstring.
+        With idle, a needed full draw goes through draw_idle, so the GUI can coalesce a
+        burst of them (e.g. while dragging).
+        """
+        # e.g. savefig at another dpi drew (and snapshotted) the figure at a different size
+        if self._background_dirty or not self._snapshots or self._size != self.figure.bbox.size.tolist():
+            # _on_draw retakes the background and draws every layer
+            if idle:
+                self.canvas.draw_idle()
+            else:
+                self.canvas.draw()
+            return
+        if self._dirty is None:
+            return
+        if self._dirty == len(self._layers) - 1 and len(self._snapshots) == len(self._layers):
+            self._update_top_layer(top_key)
+            return
+        self._draw_layers(self._dirty)
+        self.canvas.blit(self.figure.bbox)
+
+    def _layer_extent(self, name: str) -> Bbox | None:
+        renderer = self.canvas.get_renderer()
+        extents = [a.get_window_extent(renderer) for a in self._layers[name]
+                   if a.get_visible() and (a.axes is not None or a.figure is not None)]
+        if not extents:
+            return None
+        pad = self.TOP_LAYER_PAD * self.figure.dpi
+        return Bbox.union(extents).expanded(1, 1).padded(pad)
+
+    def _update_top_layer(self, key=None):
+        name = list(self._layers)[-1]
+        cached = self._top_cache.get(key) if key is not None else None
+        new_extent = cached[0] if cached is not None else self._layer_extent(name)
+        dirty = [b for b in (self._top_extent, new_extent) if b is not None]
+        self._dirty = None
+        if not dirty:
+            return
+        region = Bbox.intersection(Bbox.union(dirty), self.figure.bbox)
+        if region is None:
+            return
+        # erase the old pixels: Agg regions count rows from the top, display coordinates
+        # from the bottom; xy is where the snapshot's origin goes (it covers the whole
+        # figure, so it stays put)
+        height = self.figure.bbox.height
+        x0, y0, x1, y1 = region.extents
+        self.canvas.restore_region(self._snapshots[-1], bbox=(int(x0), int(height - y1),
+                                                               int(x1) + 1, int(height - y0) + 1),
+                                   xy=(0, 0))
+        if cached is not None:
+            self.canvas.restore_region(cached[1])
+            self._top_cache.move_to_end(key)
+        else:
+            for artist in self._layers[name]:
+                if artist.get_visible() and (artist.axes is not None or artist.figure is not None):
+                    self.figure.draw_artist(artist)
+            if key is not None and new_extent is not None:
+                visible = Bbox.intersection(new_extent, self.figure.bbox)
+                if visible is not None:
+                    self._top_cache[key] = (new_extent, self.canvas.copy_from_bbox(visible))
+                    while len(self._top_cache) > self.MAX_TOP_CACHE:
+                        self._top_cache.popitem(last=False)
+        self._top_extent = new_extent
+        self.canvas.blit(region)
+
+    def _draw_layers(self, start: int):
+        # layers added since the last full draw have no snapshot below them yet
+        start = min(start, len(self._snapshots) - 1)
+        self.canvas.restore_region(self._snapshots[start])
+        del self._snapshots[start + 1:]
+        # cached top layer pixels include what was below them
+        self._top_cache.clear()
+        names = list(self._layers)
+        for index in range(start, len(names)):
+            for artist in self._layers[names[index]]:
+                if artist.get_visible() and (artist.axes is not None or artist.figure is not None):
+                    self.figure.draw_artist(artist)
+            # nothing ever restores above the top layer, so don't save it
+            if index < len(names) - 1:
+                self._snapshots.append(self.canvas.copy_from_bbox(self.figure.bbox))
+        self._top_extent = self._layer_extent(names[-1]) if names else None
+        self._dirty = None
+
+    def _on_draw(self, event):
+        if self._flattened or event is None or event.canvas is not self.canvas:
+            return
+        # the full draw skipped every animated artist: what is on the canvas is the background
+        self._snapshots = [self.canvas.copy_from_bbox(self.figure.bbox)]
+        self._size = self.figure.bbox.size.tolist()
+        self._background_dirty = False
+        self._draw_layers(0)
+
+    @contextmanager
+    def flattened(self):
+        """
+        Draw every layer as ordinary artists for the duration, e.g. around savefig, which
+        otherwise skips animated artists.
+        """
+        artists = [a for layer in self._layers.values() for a in layer]
+        self._flattened = True
+        for artist in artists:
+            artist.set_animated(False)
+        try:
+            yield self.figure
+        finally:
+            for artist in artists:
+                artist.set_animated(True)
+            self._flattened = False
+            self.invalidate()
+
+    def disconnect(self):
+        self.canvas.mpl_disconnect(self._cid)
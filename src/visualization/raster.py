@@ -0,0 +1,77 @@
+# point rasterization: aggregate points into a pixel grid and shade it, datashader-style
+import numpy as np
+import matplotlib.pyplot as plt
+
+TRANSFER_FUNCTIONS = ("linear", "log", "cbrt", "eq_hist")
+
+
+def aggregate_points(x: np.ndarray, y: np.ndarray, extent, shape: tuple[int, int]) -> np.ndarray:
+    """
+    Count points per pixel of a (rows, cols) grid covering extent = (xmin, xmax, ymin, ymax).
+    Row 0 is the bottom row (imshow origin="lower"). Points outside the extent or with
+    NaN coordinates are dropped. One bincount, so the cost is O(points + pixels).
+    """
+    rows, cols = shape
+    xmin, xmax, ymin, ymax = extent
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+    # the max edge belongs to the last pixel, like np.histogram2d
+    ix = np.minimum(((x[keep] - xmin) / (xmax - xmin) * cols).astype(np.int64), cols - 1)
+    iy = np.minimum(((y[keep] - ymin) / (ymax - ymin) * rows).astype(np.int64), rows - 1)
+    counts = np.bincount(iy * cols + ix, minlength=rows * cols)
+    return counts.reshape(rows, cols)
+
+
+def transfer(counts: np.ndarray, how: str = "eq_hist") -> np.ndarray:
+    """
+    Map counts to [0, 1] for coloring; empty pixels stay 0 (see shade()).
+
+        linear   count / max
+        log      log(1 + count) / log(1 + max)
+        cbrt     cube root, between linear and log
+        eq_hist  histogram equalization: the rank of the count among all non-empty pixel
+                 counts, so every color is used by about the same number of pixels
+    """
+    counts = np.asarray(counts)
+    values = np.zeros(counts.shape, dtype=float)
+    filled = counts > 0
+    if not filled.any():
+        return values
+    top = counts.max()
+
+    if how == "linear":
+        values[filled] = counts[filled] / top
+    elif how == "log":
+        values[filled] = np.log1p(counts[filled]) / np.log1p(top)
+    elif how == "cbrt":
+        values[filled] = np.cbrt(counts[filled]) / np.cbrt(top)
+    elif how == "eq_hist":
+        levels, inverse, freq = np.unique(counts[filled], return_inverse=True, return_counts=True)
+        cdf = np.cumsum(freq) / freq.sum()
+        # lowest count -> 0, highest -> 1 (a single level is shown at the top)
+        span = cdf[-1] - cdf[0]
+        values[filled] = (cdf[inverse] - cdf[0]) / span if span > 0 else 1.0
+    else:
+        raise ValueError(f"unknown transfer function {how!r}, use one of {TRANSFER_FUNCTIONS}")
+    return values
+
+
+def shade(counts: np.ndarray, how: str = "eq_hist", cmap="plasma", min_alpha: float = 0.4,
+          low: float = 0.15) -> np.ndarray:
+    """
+    RGBA uint8 image of counts: transfer() values mapped onto cmap[low, 1] (the darkest
+    end of most maps vanishes on a basemap), alpha ramping from min_alpha to 1 with the
+    value. Empty pixels are fully transparent.
+    """
+    values = transfer(counts, how)
+    rgba = plt.get_cmap(cmap)(low + (1 - low) * values)
+    rgba[..., 3] = np.where(counts > 0, min_alpha + (1 - min_alpha) * values, 0.0)
+    return (rgba * 255).astype(np.uint8)
+
+
+def axes_pixel_shape(ax) -> tuple[int, int]:
+    """(rows, cols) of screen pixels covered by ax, after aspect adjustment."""
+    ax.apply_aspect()
+    bbox = ax.get_window_extent()
+    return max(int(round(bbox.height)), 1), max(int(round(bbox.width)), 1)
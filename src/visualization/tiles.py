@@ -0,0 +1,312 @@
+# persistent basemap tile store (MBTiles layout) and the tile math/mosaicking around it
+import io
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from src.utils.snapshot import get_cache_dir
+
+# half the width of the EPSG:3857 world, in meters
+_WORLD_HALF = 20037508.342789244
+
+OFFLINE_ENV = "BIKE_CRASH_TILES_OFFLINE"
+DEFAULT_STORE_BYTES = 512 * 1024 * 1024
+
+# concurrent downloads of missing tiles: pool size, and the cap on requests in flight
+# to any one tile host (tile servers throttle or ban clients that open too many)
+MAX_FETCH_WORKERS = 16
+MAX_PER_HOST = 8
+FETCH_RETRIES = 3
+
+
+def source_key(source) -> str:
+    # xyzservices providers have a unique name; plain URL templates are their own key
+    return getattr(source, "name", None) or str(source)
+
+
+def tile_url(source, z: int, x: int, y: int) -> str:
+    """URL of one tile for an xyzservices provider or a plain "{z}/{x}/{y}" URL template."""
+    if hasattr(source, "build_url"):
+        return source.build_url(x=x, y=y, z=z)
+    return str(source).format(x=x, y=y, z=z)
+
+
+def auto_zoom(extent, max_zoom: int = 19) -> int:
+    """Zoom level contextily would pick for extent = (xmin, xmax, ymin, ymax) in EPSG:3857."""
+    xmin, xmax, ymin, ymax = extent
+    lon_length = math.degrees((xmax - xmin) / 6378137.0)
+    lat_min = math.degrees(2 * math.atan(math.exp(ymin / 6378137.0)) - math.pi / 2)
+    lat_max = math.degrees(2 * math.atan(math.exp(ymax / 6378137.0)) - math.pi / 2)
+    zoom_lon = math.ceil(math.log2(360 * 2.0 / lon_length))
+    zoom_lat = math.ceil(math.log2(360 * 2.0 / (lat_max - lat_min)))
+    return int(min(max(zoom_lon, zoom_lat), max_zoom))
+
+
+def tile_range(extent, zoom: int) -> tuple[range, range]:
+    """XYZ tile columns and rows covering extent = (xmin, xmax, ymin, ymax) in EPSG:3857."""
+    xmin, xmax, ymin, ymax = extent
+    n = 2 ** zoom
+    size = 2 * _WORLD_HALF / n
+
+    def clamp(v):
+        return min(max(v, 0), n - 1)
+
+    x0 = clamp(int((xmin + _WORLD_HALF) // size))
+    x1 = clamp(int((xmax + _WORLD_HALF) // size))
+    # XYZ rows count down from the top of the world
+    y0 = clamp(int((_WORLD_HALF - ymax) // size))
+    y1 = clamp(int((_WORLD_HALF - ymin) // size))
+    return range(x0, x1 + 1), range(y0, y1 + 1)
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    """(xmin, xmax, ymin, ymax) of one tile in EPSG:3857."""
+    size = 2 * _WORLD_HALF / 2 ** z
+    xmin = -_WORLD_HALF + x * size
+    ymax = _WORLD_HALF - y * size
+    return xmin, xmin + size, ymax - size, ymax
+
+
+class TileStore:
+    """
+    SQLite tile cache in the MBTiles layout (metadata + tiles tables, TMS row order), so
+    the file also opens in MBTiles tools. An extra tile_access table tracks size and
+    last use of each tile; once the store grows past max_bytes the least recently used
+    tiles are evicted. Safe to share between threads.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_STORE_BYTES, name: str = ""):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS tiles (
+                    zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+                CREATE UNIQUE INDEX IF NOT EXISTS tile_index ON tiles (zoom_level, tile_column, tile_row);
+                CREATE TABLE IF NOT EXISTS tile_access (
+                    zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER,
+                    size INTEGER, last_access REAL,
+                    PRIMARY KEY (zoom_level, tile_column, tile_row));
+                CREATE INDEX IF NOT EXISTS tile_access_lru ON tile_access (last_access);
+            """)
+            self._conn.execute("INSERT OR IGNORE INTO metadata VALUES ('name', ?)", (name,))
+            self._conn.execute("INSERT OR IGNORE INTO metadata VALUES ('format', 'png')")
+            self._conn.execute("INSERT OR IGNORE INTO metadata VALUES ('type', 'baselayer')")
+
+    @staticmethod
+    def _tms_row(z: int, y: int) -> int:
+        return 2 ** z - 1 - y
+
+    def get(self, z: int, x: int, y: int) -> bytes | None:
+        row = self._tms_row(z, y)
+        with self._lock, self._conn:
+            found = self._conn.execute(
+                "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                (z, x, row)).fetchone()
+            if found is None:
+                return None
+            self._conn.execute(
+                "UPDATE tile_access SET last_access=? WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                (time.time(), z, x, row))
+        return found[0]
+
+    def put(self, z: int, x: int, y: int, data: bytes):
+        row = self._tms_row(z, y)
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)", (z, x, row, data))
+            self._conn.execute("INSERT OR REPLACE INTO tile_access VALUES (?, ?, ?, ?, ?)",
+                               (z, x, row, len(data), time.time()))
+        self.evict()
+
+    def contains(self, z: int, x: int, y: int) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                (z, x, self._tms_row(z, y))).fetchone() is not None
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM tile_access").fetchone()[0]
+
+    def evict(self):
+        """Drop least recently used tiles until the store fits in max_bytes."""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        with self._lock, self._conn:
+            victims = []
+            for z, x, row, size in self._conn.execute(
+                    "SELECT zoom_level, tile_column, tile_row, size FROM tile_access ORDER BY last_access"):
+                if total <= self.max_bytes:
+                    break
+                victims.append((z, x, row))
+                total -= size
+            self._conn.executemany(
+                "DELETE FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?", victims)
+            self._conn.executemany(
+                "DELETE FROM tile_access WHERE zoom_level=? AND tile_column=? AND tile_row=?", victims)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_tile_store(source, max_bytes: int = DEFAULT_STORE_BYTES) -> TileStore:
+    """The process-wide store for a tile source, under <cache dir>/tiles/<source>.mbtiles."""
+    key = source_key(source)
+    with _STORES_LOCK:
+        if key not in _STORES:
+            file_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", key).strip("_") + ".mbtiles"
+            path = os.path.join(get_cache_dir(), "tiles", file_name)
+            _STORES[key] = TileStore(path, max_bytes=max_bytes, name=key)
+        return _STORES[key]
+
+
+def _offline() -> bool:
+    return os.environ.get(OFFLINE_ENV, "") not in ("", "0")
+
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+_HOST_SLOTS = {}
+
+
+def get_session():
+    """
+    Shared requests session: keep-alive connections pooled per host (one per worker),
+    and retries with backoff on connection errors and 429/5xx answers.
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(total=FETCH_RETRIES, backoff_factor=0.2, allowed_methods=("GET",),
+                          status_forcelist=(429, 500, 502, 503, 504))
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_FETCH_WORKERS, max_retries=retry)
+            session = requests.Session()
+            session.headers["User-Agent"] = "bike-crash-viz"
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _SESSION = session
+        return _SESSION
+
+
+def _host_slot(url: str) -> threading.Semaphore:
+    host = urlsplit(url).netloc
+    with _SESSION_LOCK:
+        if host not in _HOST_SLOTS:
+            _HOST_SLOTS[host] = threading.Semaphore(MAX_PER_HOST)
+        return _HOST_SLOTS[host]
+
+
+def _download_tile(source, z: int, x: int, y: int, session=None) -> bytes:
+    url = tile_url(source, z, x, y)
+    with _host_slot(url):
+        response = (session or get_session()).get(url, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+
+def download_tiles(source, tiles: list[tuple[int, int, int]], workers: int = MAX_FETCH_WORKERS):
+    """
+    Download tiles concurrently on a thread pool over the shared session; yields
+    ((z, x, y), bytes) as downloads finish. workers=1 downloads one at a time.
+    """
+    if not tiles:
+        return
+    if workers <= 1 or len(tiles) == 1:
+        for tile in tiles:
+            yield tile, _download_tile(source, *tile)
+        return
+    session = get_session()
+    with ThreadPoolExecutor(max_workers=min(workers, len(tiles))) as pool:
+        futures = {pool.submit(_download_tile, source, *tile, session=session): tile for tile in tiles}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # on an error (or an abandoned generator) don't start the queued downloads
+            for future in futures:
+                future.cancel()
+
+
+def fetch_tiles(source, tiles: list[tuple[int, int, int]], store: TileStore | None = None,
+                workers: int = MAX_FETCH_WORKERS) -> dict:
+    """
+    Bytes for each (z, x, y), read through the tile store: stored tiles are returned
+    as is, missing ones are downloaded concurrently (see download_tiles) and stored.
+    With $BIKE_CRASH_TILES_OFFLINE set, missing tiles are left out instead of downloaded.
+    """
+    store = store or get_tile_store(source)
+    result = {}
+    missing = []
+    for tile in tiles:
+        data = store.get(*tile)
+        if data is None:
+            missing.append(tile)
+        else:
+            result[tile] = data
+
+    if missing and not _offline():
+        for tile, data in download_tiles(source, missing, workers):
+            store.put(*tile, data)
+            result[tile] = data
+    return result
+
+
+def _decode_tile(data: bytes) -> np.ndarray:
+    from PIL import Image
+
+    return np.asarray(Image.open(io.BytesIO(data)).convert("RGBA"))
+
+
+def tile_mosaic(source, extent, zoom="auto") -> tuple[np.ndarray, tuple]:
+    """
+    Stitch the tiles covering extent = (xmin, xmax, ymin, ymax) in EPSG:3857 into one
+    RGBA image. Returns (image, image extent), like ctx.bounds2img. Tiles come from the
+    persistent tile store; tiles that are unavailable offline stay transparent.
+    """
+    if zoom == "auto":
+        zoom = auto_zoom(extent, getattr(source, "max_zoom", 19))
+    xs, ys = tile_range(extent, zoom)
+    tiles = fetch_tiles(source, [(zoom, x, y) for x in xs for y in ys])
+
+    decoded = {key: _decode_tile(data) for key, data in tiles.items()}
+    tile_px = next(iter(decoded.values())).shape[0] if decoded else 256
+
+    mosaic = np.zeros((len(ys) * tile_px, len(xs) * tile_px, 4), dtype=np.uint8)
+    for (_, x, y), tile in decoded.items():
+        row, col = (y - ys.start) * tile_px, (x - xs.start) * tile_px
+        mosaic[row:row + tile_px, col:col + tile_px] = tile[:tile_px, :tile_px]
+
+    xmin, _, _, ymax = tile_bounds(zoom, xs.start, ys.start)
+    _, xmax, ymin, _ = tile_bounds(zoom, xs[-1], ys[-1])
+    return mosaic, (xmin, xmax, ymin, ymax)
+
+
+def prefetch_tiles(source, extent, zooms: list[int], workers: int = MAX_FETCH_WORKERS) -> int:
+    """Warm the store with every tile covering extent at the given zoom levels; returns the tile count."""
+    tiles = []
+    for zoom in zooms:
+        xs, ys = tile_range(extent, zoom)
+        tiles.extend((zoom, x, y) for x in xs for y in ys)
+    fetch_tiles(source, tiles, workers=workers)
+    return len(tiles)